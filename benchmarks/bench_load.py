@@ -0,0 +1,345 @@
+"""并发压测：在本机启动服务，按配置的比例混合请求 /?view=table、/add、/edit/<id>、/bookmark/<id>、/delete/<id>、/export、/import。
+
+对每个数据规模各启动一个全新的服务（先通过 /import 灌入数据），依次用不同的并发客户端数各压测一段时间，
+输出吞吐、p50 / p95 / p99 延迟、错误率、数据库锁冲突率（从服务端日志统计 "database is locked"），
+并给出每个数据规模下的饱和点：再增加并发时吞吐增长不足 10%，或 p99 超过 --slo-ms。
+用法：python benchmarks/bench_load.py [--sizes 1000,10000] [--concurrency 1,4,16,32] [--duration 10]
+                                     [--mix index=30,add=15,edit=20,bookmark=15,delete=5,export=10,import=5]
+                                     [--slo-ms 1000] [--json 结果.json]
+"""
+import argparse
+import http.client
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = 'index=30,add=15,edit=20,bookmark=15,delete=5,export=10,import=5'
+GROUPS = ['家人', '同事', '朋友', '同学', '未分组']
+SEED_CHUNK = 5000
+IMPORT_ROWS = 20
+
+SERVER_SCRIPT = '''
+import logging, sys
+import software
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+software.init_db()
+software.app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)
+'''
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))] if samples else 0.0
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        op, weight = item.split('=')
+        if op not in OPERATIONS:
+            raise SystemExit(f'未知的请求类型：{op}（可选 {", ".join(OPERATIONS)}）')
+        mix[op] = float(weight)
+    return mix
+
+
+def excel_bytes(rows):
+    import pandas as pd
+    buf = io.BytesIO()
+    pd.DataFrame(rows, columns=['姓名', '分组', '收藏', '联系方式 (Type: Value)']).to_excel(buf, index=False)
+    return buf.getvalue()
+
+
+def contact_rows(start, stop, rng):
+    return [(f'联系人{i}', rng.choice(GROUPS), rng.choice(('是', '否')),
+             f'电话: 139{i:08d}; 邮箱: user{i}@example.com') for i in range(start, stop)]
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields:
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, data in files:
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                   f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+        body.write(data)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+def form(fields):
+    return urlencode(fields).encode(), {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+class Workload:
+    """生成请求：编辑 / 收藏 / 删除从现存 id 池中随机挑选，删除时把 id 移出池。"""
+
+    def __init__(self, size, import_body):
+        self.ids = list(range(1, size + 1))
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.import_body = import_body
+
+    def pick_id(self, rng, remove=False):
+        with self.lock:
+            if not self.ids:
+                return 1
+            i = rng.randrange(len(self.ids))
+            if not remove:
+                return self.ids[i]
+            self.ids[i], self.ids[-1] = self.ids[-1], self.ids[i]
+            return self.ids.pop()
+
+    def next_name(self):
+        with self.lock:
+            self.counter += 1
+            return f'压测{self.counter}'
+
+    def contact_form(self, rng, name):
+        return form([('name', name), ('group', rng.choice(GROUPS)),
+                     ('method_type[]', '电话'), ('value[]', f'138{rng.randrange(10 ** 8):08d}'),
+                     ('method_type[]', '邮箱'), ('value[]', f'{rng.randrange(10 ** 6)}@example.com')])
+
+
+def op_index(w, rng):
+    # 超过 VIRTUAL_LIST_THRESHOLD 时 / 只返回滚动视图框架，显式要完整表格，负载才随数据规模增长
+    return 'GET', '/?view=table', None, {}
+
+
+def op_add(w, rng):
+    return ('POST', '/add') + w.contact_form(rng, w.next_name())
+
+
+def op_edit(w, rng):
+    return ('POST', f'/edit/{w.pick_id(rng)}') + w.contact_form(rng, w.next_name())
+
+
+def op_bookmark(w, rng):
+    return 'POST', f'/bookmark/{w.pick_id(rng)}', b'', {}
+
+
+def op_delete(w, rng):
+    return 'POST', f'/delete/{w.pick_id(rng, remove=True)}', b'', {}
+
+
+def op_export(w, rng):
+    query = urlencode(rng.choice(({}, {'format': 'csv'}, {'format': 'jsonl', 'bookmarked': '1'},
+                                  {'group': rng.choice(GROUPS)})))
+    return 'GET', '/export' + (f'?{query}' if query else ''), None, {}
+
+
+def op_import(w, rng):
+    return ('POST', '/import') + multipart([], [('file', 'contacts.xlsx', w.import_body)])
+
+
+OPERATIONS = {
+    'index': op_index,
+    'add': op_add,
+    'edit': op_edit,
+    'bookmark': op_bookmark,
+    'delete': op_delete,
+    'export': op_export,
+    'import': op_import,
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path, log_path):
+    port = free_port()
+    env = dict(os.environ, ADDRESS_BOOK_DB=db_path)
+    log = open(log_path, 'wb')
+    proc = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT, str(port)], cwd=ROOT, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return proc, port
+        except OSError:
+            if proc.poll() is not None:
+                raise SystemExit(f'服务启动失败，见 {log_path}')
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit('服务启动超时')
+
+
+def request(conn, method, path, body, headers):
+    conn.request(method, path, body=body, headers=headers)
+    resp = conn.getresponse()
+    resp.read()
+    return resp.status
+
+
+def seed(port, size):
+    # 分块通过 /import 灌入数据，新库中联系人 id 即为 1..size
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    rng = random.Random(0)
+    for start in range(0, size, SEED_CHUNK):
+        body, headers = multipart([], [('file', 'seed.xlsx', excel_bytes(
+            contact_rows(start, min(size, start + SEED_CHUNK), rng)))])
+        status = request(conn, 'POST', '/import', body, headers)
+        if status >= 400:
+            raise SystemExit(f'灌入数据失败：HTTP {status}')
+    conn.close()
+
+
+def client_loop(port, workload, mix, stop_at, results, seed_value):
+    rng = random.Random(seed_value)
+    ops, weights = list(mix), list(mix.values())
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    local = []
+    while time.perf_counter() < stop_at:
+        op = rng.choices(ops, weights)[0]
+        method, path, body, headers = OPERATIONS[op](workload, rng)
+        start = time.perf_counter()
+        try:
+            status = request(conn, method, path, body, headers)
+        except (OSError, http.client.HTTPException):
+            status = None
+            conn.close()
+        local.append((op, status, time.perf_counter() - start))
+    conn.close()
+    results.extend(local)
+
+
+def count_locks(log_path, offset):
+    # 每个失败请求的回溯里 sqlite3 与 SQLAlchemy 的异常行都带有该消息，只数最终的 SQLAlchemy 异常行；
+    # 只读到最后一个完整行，未写完的行留给下一次统计
+    with open(log_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    data = data[:data.rfind(b'\n') + 1]
+    locks = sum(1 for line in data.decode('utf-8', errors='replace').splitlines()
+                if line.startswith('sqlalchemy.exc.OperationalError') and 'database is locked' in line)
+    return locks, offset + len(data)
+
+
+def summarize(samples, duration, locks):
+    latencies = [s[2] * 1000 for s in samples]
+    ok = sum(1 for s in samples if s[1] is not None and s[1] < 400)
+    missing = sum(1 for s in samples if s[1] == 404)  # 并发删除导致的 404 单独统计
+    errors = len(samples) - ok - missing
+    total = max(1, len(samples))
+    return {
+        'requests': len(samples),
+        'throughput': len(samples) / duration,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'error_rate': errors / total,
+        'missing_rate': missing / total,
+        'lock_rate': locks / total,
+    }
+
+
+def run_step(port, workload, mix, clients, duration, log_path, log_offset):
+    results = []
+    stop_at = time.perf_counter() + duration
+    threads = [threading.Thread(target=client_loop, args=(port, workload, mix, stop_at, results, i))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    locks, log_offset = count_locks(log_path, log_offset)
+    step = summarize(results, elapsed, locks)
+    step['endpoints'] = {op: summarize([s for s in results if s[0] == op], elapsed, 0)
+                         for op in mix if any(s[0] == op for s in results)}
+    return step, log_offset
+
+
+def find_saturation(steps, slo_ms):
+    # 饱和点：最后一个“加并发仍能明显提高吞吐且 p99 达标”的并发数
+    best = None
+    for step in steps:
+        if step['p99_ms'] > slo_ms:
+            break
+        if best is not None and step['throughput'] < best['throughput'] * 1.1:
+            break
+        best = step
+    return best
+
+
+def print_step(size, clients, step):
+    print(f'{size:>8,} {clients:>6} {step["throughput"]:>9.1f} {step["p50_ms"]:>9.1f} {step["p95_ms"]:>9.1f} '
+          f'{step["p99_ms"]:>9.1f} {step["error_rate"] * 100:>7.2f}% {step["lock_rate"] * 100:>7.2f}% '
+          f'{step["missing_rate"] * 100:>7.2f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1000,10000')
+    parser.add_argument('--concurrency', default='1,4,16,32')
+    parser.add_argument('--duration', type=float, default=10.0, help='每个并发级别压测的秒数')
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--slo-ms', type=float, default=1000.0, help='判定饱和的 p99 上限')
+    parser.add_argument('--per-endpoint', action='store_true', help='同时输出各请求类型的延迟')
+    parser.add_argument('--json', help='把完整结果写入 JSON 文件')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    sizes = [int(x) for x in args.sizes.split(',')]
+    levels = [int(x) for x in args.concurrency.split(',')]
+    import_body = excel_bytes(contact_rows(0, IMPORT_ROWS, random.Random(1)))
+    report = []
+
+    print(f'请求比例：{args.mix}；每级 {args.duration:g} 秒')
+    print(f'{"联系人":>8} {"并发":>6} {"请求/秒":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} '
+          f'{"错误":>8} {"锁冲突":>8} {"404":>8}')
+    for size in sizes:
+        tmpdir = tempfile.mkdtemp()
+        log_path = os.path.join(tmpdir, 'server.log')
+        proc, port = start_server(os.path.join(tmpdir, 'load.db'), log_path)
+        try:
+            seed(port, size)
+            workload = Workload(size, import_body)
+            _, log_offset = count_locks(log_path, 0)
+            steps = []
+            for clients in levels:
+                step, log_offset = run_step(port, workload, mix, clients, args.duration, log_path, log_offset)
+                step['clients'] = clients
+                steps.append(step)
+                print_step(size, clients, step)
+                if args.per_endpoint:
+                    for op, s in step['endpoints'].items():
+                        print(f'{"":>8} {op:>15} {s["requests"]:>6} 次  p50 {s["p50_ms"]:.1f}  '
+                              f'p95 {s["p95_ms"]:.1f}  p99 {s["p99_ms"]:.1f} ms  错误 {s["error_rate"] * 100:.2f}%')
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        saturation = find_saturation(steps, args.slo_ms)
+        if saturation is None:
+            print(f'{"":>8} 饱和点：并发 {levels[0]} 时 p99 已超过 {args.slo_ms:g} ms')
+        else:
+            print(f'{"":>8} 饱和点：约 {saturation["clients"]} 个并发客户端，'
+                  f'{saturation["throughput"]:.1f} 请求/秒（p99 {saturation["p99_ms"]:.1f} ms）')
+        report.append({'size': size, 'steps': steps,
+                       'saturation_clients': saturation['clients'] if saturation else None})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'mix': mix, 'duration': args.duration, 'results': report}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
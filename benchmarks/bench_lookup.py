@@ -0,0 +1,68 @@
+"""来电反查基准测试：对比 LIKE 全表扫描、lookup_key 索引查询和 LRU 缓存命中的每秒查询数。
+
+用法：python benchmarks/bench_lookup.py [--contacts 20000] [--queries 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def rate(label, n, fn):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28}{n / elapsed:>12,.0f} 次/秒')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--contacts', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=5000)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ['ADDRESS_BOOK_DB'] = os.path.join(tmpdir, 'bench.db')
+    import software
+    from software import app, db, Contact, ContactMethod, build_method, lookup_cache
+
+    software.init_db()
+    phones = [f'139{i:08d}' for i in range(args.contacts)]
+    with app.app_context():
+        contacts = [Contact(name=f'联系人{i}') for i in range(args.contacts)]
+        db.session.add_all(contacts)
+        db.session.flush()
+        db.session.add_all(build_method(c.id, '电话', p) for c, p in zip(contacts, phones))
+        db.session.add_all(build_method(c.id, '邮箱', f'user{c.id}@example.com') for c in contacts)
+        db.session.commit()
+
+    rng = random.Random(0)
+    targets = [rng.choice(phones) for _ in range(args.queries)]
+    client = app.test_client()
+    print(f'{args.contacts} 个联系人，{args.queries} 次查询')
+
+    with app.app_context():
+        def like_scan(i):
+            Contact.query.join(ContactMethod).filter(
+                ContactMethod.value.like(f'%{targets[i]}%')).all()
+        rate('LIKE 扫描（改造前）', min(args.queries, 500), like_scan)
+
+    def cold(i):
+        lookup_cache.clear()
+        client.get(f'/api/lookup?phone=+86 {targets[i]}')
+    rate('/api/lookup 索引（无缓存）', args.queries, cold)
+
+    for t in targets:
+        client.get(f'/api/lookup?phone={t}')
+    rate('/api/lookup LRU 命中', args.queries,
+         lambda i: client.get(f'/api/lookup?phone={targets[i]}'))
+
+
+if __name__ == '__main__':
+    main()
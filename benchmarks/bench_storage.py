@@ -0,0 +1,162 @@
+"""存储基准测试：分组 / 联系方式类型存字符串（改造前）与存字典表整数 id（改造后）的对比。
+
+改造前的库按改造前模型生成的 DDL 建表并写入数据；改造后的库是它的副本经 software.ensure_schema() 迁移而来，
+再去掉之后其他改动加入的列和索引（LATER_CHANGES），只保留字符串 -> 字典表 id 这一项差别。
+比较文件大小、各表 / 索引占用、写入速度和按类型 / 分组扫描统计的速度。
+用法：python benchmarks/bench_storage.py [--methods 1000000] [--per-contact 5]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GROUPS = ['未分组', '家人', '同事', '朋友', '同学']
+METHOD_TYPES = ['电话', '邮箱', '微信', 'QQ', '地址']
+WRITE_SAMPLE = 100000
+
+# ensure_schema() 中与字典表无关的后续改动：导出用的 contact_id 索引、联系方式汇总列
+LATER_CHANGES = '''
+DROP INDEX IF EXISTS ix_contact_method_contact_id;
+ALTER TABLE contact DROP COLUMN method_summary;
+ALTER TABLE contact DROP COLUMN primary_phone;
+'''
+
+# 改造前模型由 SQLAlchemy 生成的建表语句
+BASELINE_SCHEMA = '''
+CREATE TABLE contact (
+    id INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    is_bookmarked BOOLEAN,
+    "group" VARCHAR(50),
+    photo_path VARCHAR(200),
+    first_letter VARCHAR(1),
+    PRIMARY KEY (id)
+);
+CREATE TABLE contact_method (
+    id INTEGER NOT NULL,
+    method_type VARCHAR(50) NOT NULL,
+    value VARCHAR(200) NOT NULL,
+    contact_id INTEGER NOT NULL,
+    lookup_key VARCHAR(120),
+    PRIMARY KEY (id),
+    FOREIGN KEY(contact_id) REFERENCES contact (id)
+);
+CREATE INDEX ix_contact_method_lookup_key ON contact_method (lookup_key);
+'''
+
+
+def generate(n_methods, per_contact):
+    rng = random.Random(0)
+    n_contacts = max(1, n_methods // per_contact)
+    contacts = [(i, f'联系人{i}', i % 7 == 0, rng.randrange(len(GROUPS)), 'L') for i in range(1, n_contacts + 1)]
+    methods = []
+    for i in range(1, n_methods + 1):
+        t = rng.randrange(len(METHOD_TYPES))
+        value = f'1{rng.randrange(10 ** 10):010d}' if t == 0 else f'v{rng.randrange(10 ** 8)}'
+        methods.append((i, t, value, rng.randint(1, n_contacts), f'tel:{value}' if t == 0 else None))
+    return contacts, methods
+
+
+def build_baseline(path, contacts, methods):
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.executemany('INSERT INTO contact VALUES (?, ?, ?, ?, NULL, ?)',
+                     ((i, n, b, GROUPS[g], l) for i, n, b, g, l in contacts))
+    conn.executemany('INSERT INTO contact_method VALUES (?, ?, ?, ?, ?)',
+                     ((i, METHOD_TYPES[t], v, c, k) for i, t, v, c, k in methods))
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+
+
+def migrate(path):
+    # 与应用启动时相同的迁移：字符串列转为字典表 id，并补齐当前模型的其余列和索引；
+    # 迁移耗时包含这些后续改动的回填
+    from sqlalchemy import create_engine
+    import software
+    engine = create_engine(f'sqlite:///{path}')
+    start = time.perf_counter()
+    software.ensure_schema(engine)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.executescript(LATER_CHANGES)
+    conn.execute('VACUUM')
+    conn.close()
+    return elapsed
+
+
+def write_speed(conn, integer_coded, methods):
+    # 在现有数据和索引之上追加一批联系方式，计时后回滚，两个库保持不变
+    offset = len(methods)
+    sample = methods[:WRITE_SAMPLE]
+    if integer_coded:
+        sql = 'INSERT INTO contact_method (id, type_id, value, contact_id, lookup_key) VALUES (?, ?, ?, ?, ?)'
+        rows = [(offset + i, t + 1, v, c, k) for i, t, v, c, k in sample]
+    else:
+        sql = 'INSERT INTO contact_method (id, method_type, value, contact_id, lookup_key) VALUES (?, ?, ?, ?, ?)'
+        rows = [(offset + i, METHOD_TYPES[t], v, c, k) for i, t, v, c, k in sample]
+    start = time.perf_counter()
+    conn.executemany(sql, rows)
+    elapsed = time.perf_counter() - start
+    conn.rollback()
+    return len(rows) / elapsed
+
+
+def scan(conn, integer_coded):
+    if integer_coded:
+        queries = ['SELECT t.name, COUNT(*) FROM contact_method m JOIN method_type t ON t.id = m.type_id '
+                   'GROUP BY m.type_id',
+                   'SELECT g.name, COUNT(*) FROM contact c JOIN contact_group g ON g.id = c.group_id '
+                   'GROUP BY c.group_id']
+    else:
+        queries = ['SELECT method_type, COUNT(*) FROM contact_method GROUP BY method_type',
+                   'SELECT "group", COUNT(*) FROM contact GROUP BY "group"']
+    start = time.perf_counter()
+    for q in queries:
+        conn.execute(q).fetchall()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--methods', type=int, default=1000000)
+    parser.add_argument('--per-contact', type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ['ADDRESS_BOOK_DB'] = os.path.join(tmpdir, 'app.db')
+    contacts, methods = generate(args.methods, args.per_contact)
+    print(f'{len(contacts):,} 个联系人，{len(methods):,} 条联系方式')
+
+    before = os.path.join(tmpdir, 'before.db')
+    after = os.path.join(tmpdir, 'after.db')
+    build_baseline(before, contacts, methods)
+    shutil.copy(before, after)
+    migrate_seconds = migrate(after)
+    print(f'迁移耗时    {migrate_seconds:8.1f} 秒')
+
+    for label, path, integer_coded in (('字符串（改造前）', before, False), ('整数 id（改造后）', after, True)):
+        conn = sqlite3.connect(path)
+        rows_per_second = write_speed(conn, integer_coded, methods)
+        scan_seconds = scan(conn, integer_coded)
+        sizes = dict(conn.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name').fetchall())
+        conn.close()
+        print(f'\n== {label}')
+        print(f'文件大小    {os.path.getsize(path) / 1024 / 1024:8.1f} MB')
+        print(f'写入速度    {rows_per_second:8,.0f} 行/秒')
+        print(f'统计扫描    {scan_seconds * 1000:8.1f} ms')
+        for name, size in sorted(sizes.items(), key=lambda kv: -kv[1])[:8]:
+            print(f'  {name:<28}{size / 1024 / 1024:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
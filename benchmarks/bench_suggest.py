@@ -0,0 +1,62 @@
+"""输入联想基准测试：在 N 个联系人上测 /api/suggest 的延迟（目标 10 万联系人 < 5 ms）。
+
+用法：python benchmarks/bench_suggest.py [--contacts 100000] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--contacts', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ['ADDRESS_BOOK_DB'] = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    from software import app, suggest_index
+
+    rng = random.Random(0)
+    # GBK 一级汉字区（B0A1-D7F9）覆盖常用字，首字母可被 get_first_letter 识别
+    def random_char():
+        return bytes([rng.randint(0xB0, 0xD7), rng.randint(0xA1, 0xF9)]).decode('gbk', errors='ignore') or '王'
+    names = [''.join(random_char() for _ in range(rng.choice((2, 3)))) for _ in range(args.contacts)]
+
+    start = time.perf_counter()
+    suggest_index.build(enumerate(names, start=1))
+    print(f'构建索引：{args.contacts} 个联系人，{time.perf_counter() - start:.2f} 秒')
+
+    updates = 1000
+    start = time.perf_counter()
+    for i in range(updates):
+        suggest_index.update(args.contacts + i, names[i])
+    print(f'增量更新：{(time.perf_counter() - start) * 1000 / updates:.3f} 毫秒/次')
+
+    queries = []
+    for _ in range(args.queries):
+        name = rng.choice(names)
+        queries.append(rng.choice((name[:1], name[:2], ''.join(rng.choice('bcdghjlmswxyz') for _ in range(2)))))
+
+    client = app.test_client()
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        client.get('/api/suggest', query_string={'q': q})
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f'/api/suggest：p50 {percentile(timings, 50):.2f} ms，'
+          f'p95 {percentile(timings, 95):.2f} ms，p99 {percentile(timings, 99):.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,88 @@
-from flask import Flask, request, redirect, url_for, send_file, flash, render_template_string
+from flask import Flask, request, redirect, url_for, send_file, flash, render_template_string, jsonify, \
+    has_request_context, has_app_context, Response, stream_with_context, get_flashed_messages, g, session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import inspect, event, create_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.hybrid import hybrid_property
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+import bisect
 import pandas as pd
-import io
 import os
 import re
+import csv
+import base64
+import glob
+import gzip
+import json
+import time
+import shutil
+import sqlite3
+import atexit
+import queue
+import hashlib
+import secrets
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+import click
+
+try:  # 可选依赖：安装 pypinyin 后联想支持全拼
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
 
 # ==================================
 # 1. 初始化和配置
 # ==================================
 app = Flask(__name__)
-DB_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'address_book.db')
+DB_PATH = os.environ.get('ADDRESS_BOOK_DB') or \
+    os.path.join(os.path.abspath(os.path.dirname(__file__)), 'address_book.db')
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
 app.config['SECRET_KEY'] = 'your_final_secret_key'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-db = SQLAlchemy(app)
+app.config['LOOKUP_CACHE_SIZE'] = 10000  # 来电查询 LRU 缓存条目数
+app.config['EXPORT_CACHE_DIR'] = os.path.join(os.path.dirname(DB_PATH), 'export_cache')
+app.config['EXPORT_REBUILD_DELAY'] = 2.0  # 写入停止多少秒后在后台重建导出快照
+app.config['BACKUP_DIR'] = os.path.join(os.path.dirname(DB_PATH), 'backups')
+app.config['BACKUP_KEEP'] = 7           # 保留最近几份快照
+app.config['BACKUP_PAGES_PER_STEP'] = 256  # 在线备份每步复制的页数，步间让出锁
+app.config['BACKUP_STEP_SLEEP'] = 0.005
+app.config['ADMIN_TOKEN'] = os.environ.get('ADDRESS_BOOK_ADMIN_TOKEN')
+app.config['AUDIT_BATCH_SIZE'] = 500        # 审计日志后台批量写入的条数上限
+app.config['AUDIT_FLUSH_INTERVAL'] = 1.0    # 最长多少秒刷一次盘
+app.config['LIST_CHUNK_SIZE'] = 500          # 列表按块读取联系人并批量加载联系方式
+app.config['STREAM_RENDER_THRESHOLD'] = 2000  # 完整表格超过该数量时改为流式输出
+app.config['VIRTUAL_LIST_THRESHOLD'] = 2000  # 超过该数量时首页默认使用虚拟滚动视图
+app.config['AVATAR_DIR'] = os.path.join(app.root_path, 'static', 'avatars')
+app.config['AVATAR_MAX_BYTES'] = 2 * 1024 * 1024  # 单个头像大小上限
+app.config['AVATAR_CHUNK_SIZE'] = 64 * 1024
+app.config['IMPORT_WORKERS'] = None      # 批量导入解析进程数，None 表示 CPU 核数
+app.config['IMPORT_BATCH_SIZE'] = 1000   # 批量导入每个写事务包含的联系人数
+app.config['TENANT_DIR'] = os.environ.get('ADDRESS_BOOK_TENANT_DIR')  # 设置后启用多租户，每个租户一个子目录
+app.config['TENANT_AVATAR_DIR'] = os.path.join(app.root_path, 'static', 'tenants')
+app.config['TENANT_AUTO_CREATE'] = True   # 首次访问未知租户时自动建库
+app.config['TENANT_CACHE_SIZE'] = 64      # 同时保持打开的租户引擎数（LRU），限制文件句柄
+app.config['TENANT_POOL_SIZE'] = 2        # 每个租户引擎的连接池大小
+app.config['TENANT_MAX_OVERFLOW'] = 3
+
+
+class TenantSession(FlaskSQLAlchemySession):
+    """多租户模式下按当前请求的租户选择数据库引擎。"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            tenant = current_tenant()
+            if tenant.engine is not None:
+                return tenant.get_engine()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(app, session_options={'class_': TenantSession})
 
 
 # ==================================
@@ -59,48 +128,960 @@ def get_first_letter(name):
     return '?'
 
 
+def get_initials(name):
+    # 每个汉字 / 英文单词取首字母，例如 "张三" -> "zs"
+    letters = []
+    for token in re.findall(r'[A-Za-z]+|[^\sA-Za-z]', name or ''):
+        letter = get_first_letter(token)
+        if letter != '?':
+            letters.append(letter)
+    return ''.join(letters).lower()
+
+
+def get_search_keys(name):
+    keys = {(name or '').strip().lower(), get_initials(name)}
+    if lazy_pinyin is not None:
+        keys.add(''.join(lazy_pinyin(name or '')).lower())
+    keys.discard('')
+    return keys
+
+
+# ==================================
+# 工具函数：联系方式查询键（来电显示 / 邮箱反查）
+# ==================================
+def normalize_phone(value):
+    digits = re.sub(r'\D', '', value or '')
+    # 去掉国际区号，保证 +86 138... 与 138... 命中同一个键
+    if digits.startswith('0086'):
+        digits = digits[4:]
+    elif digits.startswith('86') and len(digits) == 13:
+        digits = digits[2:]
+    return digits
+
+
+def normalize_lookup_key(method_type, value):
+    if method_type == '电话':
+        digits = normalize_phone(value)
+        return f'tel:{digits}' if digits else None
+    if method_type == '邮箱':
+        email = (value or '').strip().lower()
+        return f'mail:{email}' if email else None
+    return None
+
+
+class LRUCache:
+    """线程安全的 LRU 缓存；clear() 之后，清空前开始的加载结果不会再写回。"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.capacity:
+                    self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+
+class SuggestIndex:
+    """姓名 / 全拼 / 拼音首字母的前缀索引：有序数组 + bisect，写入时增量维护。"""
+
+    def __init__(self):
+        self._keys = []     # 有序的 (key, contact_id)
+        self._names = {}    # contact_id -> (name, keys)
+        self._lock = threading.RLock()
+        self.built = False
+
+    def build(self, rows):
+        with self._lock:
+            self._names = {cid: (name, get_search_keys(name)) for cid, name in rows}
+            self._keys = sorted((k, cid) for cid, (_, keys) in self._names.items() for k in keys)
+            self.built = True
+
+    def remove(self, contact_id):
+        with self._lock:
+            entry = self._names.pop(contact_id, None)
+            if entry is None:
+                return
+            for k in entry[1]:
+                i = bisect.bisect_left(self._keys, (k, contact_id))
+                if i < len(self._keys) and self._keys[i] == (k, contact_id):
+                    del self._keys[i]
+
+    def update(self, contact_id, name):
+        with self._lock:
+            entry = self._names.get(contact_id)
+            if entry is not None and entry[0] == name:
+                return
+            self.remove(contact_id)
+            keys = get_search_keys(name)
+            self._names[contact_id] = (name, keys)
+            for k in keys:
+                bisect.insort(self._keys, (k, contact_id))
+
+    def search(self, prefix, limit=10):
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        results, seen = [], set()
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(results) < limit:
+                key, cid = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                if cid not in seen:
+                    seen.add(cid)
+                    results.append({'id': cid, 'name': self._names[cid][0]})
+                i += 1
+        return results
+
+
+
+# ==================================
+# 工具函数：头像上传（分块写临时文件、边写边哈希、按内容命名）
+# ==================================
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+
+class AvatarError(ValueError):
+    pass
+
+
+def sniff_image_type(head):
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def avatar_request_too_large():
+    # 请求体明显超过头像上限时，不解析表单直接拒绝
+    length = request.content_length or 0
+    return length > app.config['AVATAR_MAX_BYTES'] + app.config['AVATAR_CHUNK_SIZE']
+
+
+def save_avatar(photo_file):
+    avatar_dir = current_tenant().avatar_dir
+    os.makedirs(avatar_dir, exist_ok=True)
+    max_bytes = app.config['AVATAR_MAX_BYTES']
+    chunk_size = app.config['AVATAR_CHUNK_SIZE']
+
+    fd, tmp_path = tempfile.mkstemp(dir=avatar_dir, prefix='.upload-')
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        ext = None
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = photo_file.stream.read(chunk_size)
+                if not chunk:
+                    break
+                if ext is None:
+                    ext = sniff_image_type(chunk)
+                    if ext is None:
+                        raise AvatarError('头像只支持 PNG / JPEG / GIF / WebP 图片')
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AvatarError(f'头像不能超过 {max_bytes // 1024 // 1024} MB')
+                digest.update(chunk)
+                out.write(chunk)
+        if ext is None:
+            raise AvatarError('头像文件为空')
+
+        # 按内容哈希命名后原子改名：同名文件不会互相覆盖，相同图片只存一份
+        filename = f'{digest.hexdigest()[:32]}.{ext}'
+        os.replace(tmp_path, os.path.join(avatar_dir, filename))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.relpath(os.path.join(avatar_dir, filename), app.root_path).replace(os.sep, '/')
+
+
 # ==================================
 # 2. 数据库模型定义（新增 group / photo / first_letter）
 # ==================================
+DEFAULT_GROUPS = ('未分组', '家人', '同事', '朋友', '同学')  # 未分组固定为 id 1
+DEFAULT_METHOD_TYPES = ('电话', '邮箱', '微信', 'QQ', '地址')
+
+
+class ContactGroup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+
+class MethodType(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+
+class NameTable:
+    """字典表的 id <-> 名称内存缓存（每个租户一份）；遇到新名称时在当前事务中插入。
+
+    新插入的字典项在提交前只记在会话的 name_pending 中，提交后才进入租户共享的缓存，
+    避免其他请求拿到随后被回滚的 id。
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+
+    def _cache(self):
+        return current_tenant().name_caches[self.model]
+
+    def _remember(self, id_, name):
+        ids, names = self._cache()
+        with self._lock:
+            ids[name] = id_
+            names[id_] = name
+
+    def _execute(self, stmt):
+        # 字典表只经 Core 语句写入，查询无需先 flush；否则在 setter 中会把构造到一半的联系人提前写出，
+        # 审计里出现默认值的 create 加一条 update
+        with db.session.no_autoflush:
+            return db.session.execute(stmt)
+
+    def _pending(self):
+        # 当前事务中新插入、尚未提交的字典项：名称 -> id
+        return db.session.info.get('name_pending', {}).get(self, {})
+
+    def find_id(self, name):
+        ids = self._cache()[0]
+        if name not in ids:
+            pending = self._pending()
+            if name in pending:
+                return pending[name]
+            table = self.model.__table__
+            id_ = self._execute(db.select(table.c.id).where(table.c.name == name)).scalar()
+            if id_ is None:
+                return None
+            self._remember(id_, name)
+        return ids[name]
+
+    def id_for(self, name):
+        id_ = self.find_id(name)
+        if id_ is None:
+            table = self.model.__table__
+            self._execute(sqlite_insert(table).values(name=name).on_conflict_do_nothing())
+            id_ = self._execute(db.select(table.c.id).where(table.c.name == name)).scalar_one()
+            db.session.info.setdefault('name_pending', {}).setdefault(self, {})[name] = id_
+        return id_
+
+    def name_for(self, id_):
+        if id_ is None:
+            return None
+        names = self._cache()[1]
+        if id_ not in names:
+            for name, pending_id in self._pending().items():
+                if pending_id == id_:
+                    return name
+            table = self.model.__table__
+            name = self._execute(db.select(table.c.name).where(table.c.id == id_)).scalar()
+            if name is None:
+                return None
+            self._remember(id_, name)
+        return names[id_]
+
+
+group_names = NameTable(ContactGroup)
+method_type_names = NameTable(MethodType)
+
+
 class Contact(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     is_bookmarked = db.Column(db.Boolean, default=False)
 
-    group = db.Column(db.String(50), default="未分组")  # 新增：分组
+    # 分组存为整数 id，group 属性按名称读写，查询中也可直接使用
+    group_id = db.Column(db.Integer, db.ForeignKey('contact_group.id'), default=1, index=True)
     photo_path = db.Column(db.String(200), default=None)  # 新增：头像
     first_letter = db.Column(db.String(1), default='?')  # 新增：拼音首字母
 
     methods = db.relationship('ContactMethod', backref='contact',
                               lazy='dynamic', cascade="all, delete-orphan")
 
+    # 联系方式汇总（冗余列）：按 id 排序的 [[类型, 值], ...] JSON 和第一个电话，
+    # 由 commit_changes 在同一事务内维护，列表 / API / 导出只读 contact 一张表
+    method_summary = db.Column(db.Text, nullable=False, default='[]')
+    primary_phone = db.Column(db.String(200))
+
+    @property
+    def method_list(self):
+        return json.loads(self.method_summary or '[]')
+
+    @hybrid_property
+    def group(self):
+        return group_names.name_for(self.group_id) if self.group_id is not None else DEFAULT_GROUPS[0]
+
+    @group.inplace.setter
+    def _group_setter(self, name):
+        self.group_id = group_names.id_for(name)
+
+    @group.inplace.expression
+    @classmethod
+    def _group_expression(cls):
+        return db.select(ContactGroup.name).where(ContactGroup.id == cls.group_id).scalar_subquery()
+
 
 class ContactMethod(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    method_type = db.Column(db.String(50), nullable=False)
+    type_id = db.Column(db.Integer, db.ForeignKey('method_type.id'), nullable=False)
     value = db.Column(db.String(200), nullable=False)
-    contact_id = db.Column(db.Integer, db.ForeignKey('contact.id'), nullable=False)
+    contact_id = db.Column(db.Integer, db.ForeignKey('contact.id'), nullable=False, index=True)
+    lookup_key = db.Column(db.String(120), index=True)  # 规范化后的电话 / 邮箱，用于反查
+
+    @hybrid_property
+    def method_type(self):
+        return method_type_names.name_for(self.type_id)
+
+    @method_type.inplace.setter
+    def _method_type_setter(self, name):
+        self.type_id = method_type_names.id_for(name)
+
+    @method_type.inplace.expression
+    @classmethod
+    def _method_type_expression(cls):
+        return db.select(MethodType.name).where(MethodType.id == cls.type_id).scalar_subquery()
+
+
+class AppMeta(db.Model):
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class AuditLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    contact_id = db.Column(db.Integer, index=True, nullable=False)
+    entity = db.Column(db.String(20), nullable=False)   # contact / method
+    entity_id = db.Column(db.Integer)
+    action = db.Column(db.String(20), nullable=False)   # create / update / delete
+    changes = db.Column(db.Text, nullable=False)        # JSON：{字段: [修改前, 修改后]}
+    actor = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+def get_data_version():
+    return db.session.query(AppMeta.value).filter_by(key='data_version').scalar() or 0
+
+
+def get_database_id():
+    return db.session.query(AppMeta.value).filter_by(key='database_id').scalar() or 0
+
+
+def build_method(contact_id, method_type, value):
+    # 直接写 type_id：按名称赋值会在构造时触发 hybrid 的类级表达式
+    return ContactMethod(contact_id=contact_id, type_id=method_type_names.id_for(method_type), value=value,
+                         lookup_key=normalize_lookup_key(method_type, value))
+
+
+def json_each_values(values):
+    # 整个列表作为一个 JSON 参数经 json_each 展开，一条语句即可，不受绑定参数个数限制
+    return db.select(db.column('value')).select_from(db.func.json_each(json.dumps(values, ensure_ascii=False)))
+
+
+def summary_columns():
+    # 从 contact_method 现算汇总值，供维护、回填和一致性检查共用
+    ordered = db.select(MethodType.name.label('type'), ContactMethod.value.label('value')) \
+        .select_from(ContactMethod).join(MethodType, MethodType.id == ContactMethod.type_id) \
+        .where(ContactMethod.contact_id == Contact.id) \
+        .order_by(ContactMethod.id).correlate(Contact).subquery()
+    phone_type = db.select(MethodType.id).where(MethodType.name == '电话').scalar_subquery()
+    return {
+        'method_summary': db.select(db.func.json_group_array(db.func.json_array(ordered.c.type, ordered.c.value)))
+        .scalar_subquery(),
+        'primary_phone': db.select(ContactMethod.value)
+        .where(ContactMethod.contact_id == Contact.id, ContactMethod.type_id == phone_type)
+        .order_by(ContactMethod.id).limit(1).scalar_subquery(),
+    }
+
+
+def refresh_method_summaries(contact_ids=None):
+    # 一条 UPDATE 重算指定联系人（None 表示全部）的汇总列；随后即提交，无需同步会话中的对象
+    stmt = db.update(Contact).values(**summary_columns()) \
+        .execution_options(synchronize_session=False, skip_audit=True)
+    if contact_ids is not None:
+        stmt = stmt.where(Contact.id.in_(json_each_values(sorted(contact_ids))))
+    return db.session.execute(stmt).rowcount
+
+
+def find_stale_summaries():
+    columns = summary_columns()
+    return db.session.execute(db.select(Contact.id).where(db.or_(
+        Contact.method_summary.is_distinct_from(columns['method_summary']),
+        Contact.primary_phone.is_distinct_from(columns['primary_phone']),
+    )).order_by(Contact.id)).scalars().all()
+
+
+def commit_changes(updated=(), deleted_ids=()):
+    # 所有写操作统一从这里提交：同一事务内重算联系方式有变动的联系人的汇总列并递增数据版本，
+    # 提交成功后再让读缓存失效、更新联想索引、安排导出快照重建
+    db.session.flush()
+    changed = db.session.info.pop('summary_dirty', None)
+    if changed:
+        refresh_method_summaries(changed)
+    renamed = [(c.id, c.name) for c in updated]
+    db.session.execute(db.update(AppMeta).where(AppMeta.key == 'data_version')
+                       .values(value=AppMeta.value + 1))
+    db.session.commit()
+    tenant = current_tenant()
+    tenant.lookup_cache.clear()
+    if tenant.suggest_index.built:
+        for cid in deleted_ids:
+            tenant.suggest_index.remove(cid)
+        for cid, name in renamed:
+            tenant.suggest_index.update(cid, name)
+    schedule_export_rebuild()
+
+
+# ---- 审计日志：会话事件捕获变更，内存队列 + 后台线程批量写入 ----
+AUDITED_FIELDS = {
+    Contact: ('name', 'group_id', 'is_bookmarked', 'photo_path', 'first_letter'),
+    ContactMethod: ('type_id', 'value'),
+}
+# 整数编码的字段在审计记录中还原为名称
+AUDIT_DISPLAY = {
+    'group_id': ('group', group_names),
+    'type_id': ('method_type', method_type_names),
+}
+
+
+def current_actor():
+    if has_request_context():
+        return request.headers.get('X-User') or request.remote_addr or 'anonymous'
+    return 'system'
+
+
+def audit_entry(entity_cls, row, action, changes):
+    is_contact = entity_cls is Contact
+    for field, (label, names) in AUDIT_DISPLAY.items():
+        if field in changes:
+            changes[label] = [names.name_for(v) for v in changes.pop(field)]
+    return {
+        'contact_id': row['id'] if is_contact else row['contact_id'],
+        'entity': 'contact' if is_contact else 'method',
+        'entity_id': row['id'],
+        'action': action,
+        'changes': changes,
+    }
+
+
+def mark_summary_dirty(session, contact_ids):
+    session.info.setdefault('summary_dirty', set()).update(contact_ids)
+
+
+def queue_audit(session, entries):
+    if entries:
+        actor = current_actor()
+        for e in entries:
+            e['actor'] = actor
+        session.info.setdefault('audit_pending', []).extend(entries)
+
+
+@event.listens_for(db.session, 'after_flush')
+def capture_flush_changes(session, flush_context):
+    # after_flush 时主键已分配，而 new / dirty / deleted 与属性历史仍是 flush 前的状态
+    entries = []
+    new, dirty, deleted = list(session.new), list(session.dirty), list(session.deleted)
+    created, removed = set(map(id, new)), set(map(id, deleted))
+    mark_summary_dirty(session, {obj.contact_id for obj in new + dirty + deleted if isinstance(obj, ContactMethod)})
+    for obj in new + dirty + deleted:
+        fields = AUDITED_FIELDS.get(type(obj))
+        if fields is None:
+            continue
+        state = inspect(obj)
+        row = {'id': obj.id, 'contact_id': getattr(obj, 'contact_id', None)}
+        if id(obj) in created:
+            action, changes = 'create', {f: [None, getattr(obj, f)] for f in fields}
+        elif id(obj) in removed:
+            action = 'delete'
+            changes = {f: [state.attrs[f].history.deleted[0] if state.attrs[f].history.deleted
+                           else getattr(obj, f), None] for f in fields}
+        else:
+            action, changes = 'update', {}
+            for f in fields:
+                hist = state.attrs[f].history
+                if hist.has_changes() and hist.deleted != hist.added:
+                    changes[f] = [hist.deleted[0] if hist.deleted else None,
+                                  hist.added[0] if hist.added else None]
+            if not changes:
+                continue
+        entries.append(audit_entry(type(obj), row, action, changes))
+    queue_audit(session, entries)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def capture_bulk_changes(orm_execute_state):
+    # Query.delete() / update() 等批量语句不经过 flush，先查出受影响的行再执行
+    if not (orm_execute_state.is_delete or orm_execute_state.is_update):
+        return None
+    if orm_execute_state.execution_options.get('skip_audit'):  # 只改冗余列的语句
+        return None
+    mapper = orm_execute_state.bind_mapper
+    entity_cls = mapper.class_ if mapper is not None else None
+    fields = AUDITED_FIELDS.get(entity_cls)
+    if fields is None:
+        return None
+
+    session = orm_execute_state.session
+    stmt = orm_execute_state.statement
+    columns = [entity_cls.id] + ([entity_cls.contact_id] if entity_cls is ContactMethod else []) + \
+        [getattr(entity_cls, f) for f in fields]
+    select_stmt = db.select(*columns)
+    if stmt.whereclause is not None:
+        select_stmt = select_stmt.where(stmt.whereclause)
+    before = [dict(r) for r in session.execute(select_stmt).mappings()]
+    if entity_cls is ContactMethod:
+        mark_summary_dirty(session, {r['contact_id'] for r in before})
+
+    result = orm_execute_state.invoke_statement()
+
+    entries = []
+    if orm_execute_state.is_delete:
+        for row in before:
+            entries.append(audit_entry(entity_cls, row, 'delete', {f: [row[f], None] for f in fields}))
+    elif before:
+        after = {r['id']: dict(r) for r in session.execute(
+            db.select(*columns).where(entity_cls.id.in_([r['id'] for r in before]))).mappings()}
+        for row in before:
+            new = after.get(row['id'], row)
+            changes = {f: [row[f], new[f]] for f in fields if row[f] != new[f]}
+            if changes:
+                entries.append(audit_entry(entity_cls, row, 'update', changes))
+    queue_audit(session, entries)
+    return result
+
+
+@event.listens_for(db.session, 'after_commit')
+def publish_audit(session):
+    pending = session.info.pop('audit_pending', None)
+    if pending:
+        audit_writer.submit(current_tenant(), pending)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_audit(session):
+    session.info.pop('audit_pending', None)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_summary_changes(session):
+    session.info.pop('summary_dirty', None)
+
+
+@event.listens_for(db.session, 'after_commit')
+def publish_name_tables(session):
+    # 新字典项已提交，才放入租户共享的缓存
+    for table, items in session.info.pop('name_pending', {}).items():
+        for name, id_ in items.items():
+            table._remember(id_, name)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_name_tables(session):
+    session.info.pop('name_pending', None)
+
+
+class AuditWriter:
+    """后台审计写入线程：请求只负责入队，按批量 / 时间间隔合并，每个租户一次 executemany。"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, tenant, entries):
+        now = datetime.now()
+        for e in entries:
+            self._queue.put((tenant, dict(e, changes=json.dumps(e['changes'], ensure_ascii=False, default=str),
+                                          created_at=now)))
+        self._ensure_started()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + app.config['AUDIT_FLUSH_INTERVAL']
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)  # flush() 请求：立即写出当前批次
+                    break
+                batch.append(item)
+                timeout = deadline - time.monotonic()
+                if len(batch) >= app.config['AUDIT_BATCH_SIZE'] or timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception:
+                app.logger.exception('审计日志写入失败，丢弃 %d 条记录', len(batch))
+            for waiter in waiters:
+                waiter.set()
+
+    def _write(self, batch):
+        by_tenant = defaultdict(list)
+        for tenant, row in batch:
+            by_tenant[tenant].append(row)
+        with app.app_context():
+            for tenant, rows in by_tenant.items():
+                with tenant.get_engine().begin() as conn:
+                    conn.execute(AuditLog.__table__.insert(), rows)
+
+    def flush(self, timeout=5.0):
+        # 等待队列中已提交的记录全部落盘（查询历史前、进程退出时调用）
+        if self._thread is not None and self._thread.is_alive():
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait(timeout)
+            return
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(item, threading.Event):
+                batch.append(item)
+        if batch:
+            self._write(batch)
+
+
+audit_writer = AuditWriter()
+atexit.register(audit_writer.flush)
+
+
+def ensure_suggest_index():
+    index = current_tenant().suggest_index
+    if not index.built:
+        index.build(db.session.query(Contact.id, Contact.name).all())
+    return index
+
+
+def ensure_schema(engine):
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # WAL 模式下长时间的流式读取不会阻塞写入（设置持久保存在数据库文件中）
+        conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+        conn.exec_driver_sql("INSERT OR IGNORE INTO app_meta (key, value) VALUES ('data_version', 0)")
+        # 每个数据库一个随机 id：各租户的数据版本都从 0 开始，导出快照 / ETag 需靠它区分
+        conn.exec_driver_sql("INSERT OR IGNORE INTO app_meta (key, value) VALUES ('database_id', ?)",
+                             (secrets.randbits(62),))
+        for table, names in (('contact_group', DEFAULT_GROUPS), ('method_type', DEFAULT_METHOD_TYPES)):
+            conn.exec_driver_sql(f'INSERT OR IGNORE INTO {table} (name) VALUES (?)', [(n,) for n in names])
+
+    # 旧数据库迁移：补充 lookup_key 列及索引并回填
+    with engine.begin() as conn:
+        columns = {c['name'] for c in inspect(conn).get_columns('contact_method')}
+        if 'lookup_key' not in columns:
+            conn.exec_driver_sql('ALTER TABLE contact_method ADD COLUMN lookup_key VARCHAR(120)')
+            conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_contact_method_lookup_key '
+                                 'ON contact_method (lookup_key)')
+            rows = conn.exec_driver_sql('SELECT id, method_type, value FROM contact_method').fetchall()
+            updates = [(normalize_lookup_key(t, v), mid) for mid, t, v in rows]
+            if updates:
+                conn.exec_driver_sql('UPDATE contact_method SET lookup_key = ? WHERE id = ?', updates)
+
+    # 旧数据库迁移：分组 / 联系方式类型字符串改为字典表整数 id
+    migrated = False
+    with engine.begin() as conn:
+        for table, old_column, new_column, dictionary, default in (
+                ('contact', 'group', 'group_id', 'contact_group', DEFAULT_GROUPS[0]),
+                ('contact_method', 'method_type', 'type_id', 'method_type', DEFAULT_METHOD_TYPES[0])):
+            columns = {c['name'] for c in inspect(conn).get_columns(table)}
+            if old_column not in columns:
+                continue
+            old = f'COALESCE("{old_column}", \'{default}\')'
+            conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {new_column} INTEGER '
+                                 f'REFERENCES {dictionary}(id)')
+            conn.exec_driver_sql(f'INSERT OR IGNORE INTO {dictionary} (name) SELECT DISTINCT {old} FROM {table}')
+            conn.exec_driver_sql(f'UPDATE {table} SET {new_column} = '
+                                 f'(SELECT id FROM {dictionary} WHERE name = {old})')
+            conn.exec_driver_sql(f'ALTER TABLE {table} DROP COLUMN "{old_column}"')
+            migrated = True
+        conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_contact_group_id ON contact (group_id)')
+        conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_contact_method_contact_id '
+                             'ON contact_method (contact_id)')
+
+    # 旧数据库迁移：补充联系方式汇总列并回填
+    with engine.begin() as conn:
+        columns = {c['name'] for c in inspect(conn).get_columns('contact')}
+        if 'method_summary' not in columns:
+            conn.exec_driver_sql("ALTER TABLE contact ADD COLUMN method_summary TEXT NOT NULL DEFAULT '[]'")
+            conn.exec_driver_sql('ALTER TABLE contact ADD COLUMN primary_phone VARCHAR(200)')
+            conn.execute(Contact.__table__.update().values(**summary_columns()))
+    if migrated:
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level='AUTOCOMMIT').exec_driver_sql('VACUUM')
+
+
+def init_db():
+    with app.app_context():
+        ensure_schema(db.engine)
+        ensure_suggest_index()
+
+
+# ---- 多租户：每个租户独立的 SQLite 文件、头像目录和各类缓存 ----
+class Tenant:
+    """一个地址簿的数据库与缓存；默认租户（name 为 None）使用 Flask-SQLAlchemy 配置的数据库。"""
+
+    def __init__(self, name=None, db_path=DB_PATH, engine=None):
+        self.name = name
+        self.db_path = db_path
+        self.engine = engine
+        self.lookup_cache = LRUCache(app.config['LOOKUP_CACHE_SIZE'])
+        self.suggest_index = SuggestIndex()
+        self.name_caches = defaultdict(lambda: ({}, {}))  # 字典表 -> (名称 -> id, id -> 名称)
+        self.export_lock = threading.RLock()
+        self.export_timer = None
+        self.closed = False
+        self._late_engine = None
+
+    @property
+    def avatar_dir(self):
+        if self.name is None:
+            return app.config['AVATAR_DIR']
+        return os.path.join(app.config['TENANT_AVATAR_DIR'], self.name)
+
+    @property
+    def export_dir(self):
+        if self.name is None:
+            return app.config['EXPORT_CACHE_DIR']
+        return os.path.join(os.path.dirname(self.db_path), 'export_cache')
+
+    @property
+    def backup_dir(self):
+        if self.name is None:
+            return app.config['BACKUP_DIR']
+        return os.path.join(os.path.dirname(self.db_path), 'backups')
+
+    def get_engine(self):
+        # 默认租户的引擎由 Flask-SQLAlchemy 管理，需在应用上下文中获取
+        if self.engine is None:
+            return db.engine
+        # 已被逐出的租户：仍在处理中的请求和迟到的审计写入改用不保留连接的引擎，
+        # 否则会在已 dispose 的引擎上重建一个永远不会关闭的连接池
+        return self._late_engine if self.closed else self.engine
+
+    def close(self):
+        if self.export_timer is not None:
+            self.export_timer.cancel()
+        if self.engine is not None:
+            self._late_engine = create_engine(self.engine.url, poolclass=NullPool)
+            self.closed = True
+            # 只关闭池中空闲的连接；正在使用的连接归还后随旧连接池一起释放
+            self.engine.dispose()
+
+
+def tenant_db_path(name):
+    return os.path.join(app.config['TENANT_DIR'], name, 'address_book.db')
+
+
+def open_tenant(name):
+    path = tenant_db_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    engine = create_engine(f'sqlite:///{path}', pool_size=app.config['TENANT_POOL_SIZE'],
+                           max_overflow=app.config['TENANT_MAX_OVERFLOW'])
+    ensure_schema(engine)
+    return Tenant(name, path, engine)
+
+
+class TenantRegistry:
+    """已打开租户的 LRU 缓存：超过容量时关闭最久未用租户的连接池，限制打开的文件句柄数。"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._tenants = OrderedDict()
+        self._opening = {}  # 名称 -> 正在打开的 Future，同名的并发请求等待同一次打开
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            tenant = self._tenants.get(name)
+            if tenant is not None:
+                self._tenants.move_to_end(name)
+                return tenant
+            opening = self._opening.get(name)
+            if opening is None:
+                opening = self._opening[name] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return opening.result()
+
+        # 建引擎、迁移（可能 VACUUM）在全局锁外进行，不阻塞其他租户的请求
+        try:
+            tenant = open_tenant(name)
+        except BaseException as e:
+            with self._lock:
+                del self._opening[name]
+            opening.set_exception(e)
+            raise
+        evicted = []
+        with self._lock:
+            del self._opening[name]
+            self._tenants[name] = tenant
+            while len(self._tenants) > self.capacity:
+                evicted.append(self._tenants.popitem(last=False)[1])
+        opening.set_result(tenant)
+        for old in evicted:
+            old.close()
+        return tenant
+
+    def close_all(self):
+        with self._lock:
+            tenants = list(self._tenants.values())
+            self._tenants.clear()
+        for tenant in tenants:
+            tenant.close()
+
+    def __len__(self):
+        return len(self._tenants)
+
+
+TENANT_NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+default_tenant = Tenant()
+tenants = TenantRegistry(app.config['TENANT_CACHE_SIZE'])
+# 单租户模式下沿用的模块级名称
+lookup_cache = default_tenant.lookup_cache
+suggest_index = default_tenant.suggest_index
+
+
+def current_tenant():
+    if has_app_context() and 'tenant' in g:
+        return g.tenant
+    return default_tenant
+
+
+def resolve_tenant(name):
+    if name is None:
+        return default_tenant
+    if not TENANT_NAME_RE.match(name):
+        raise ValueError(f'无效的租户名：{name}')
+    if not app.config['TENANT_DIR']:
+        raise ValueError('未启用多租户（需设置 ADDRESS_BOOK_TENANT_DIR）')
+    if not app.config['TENANT_AUTO_CREATE'] and not os.path.exists(tenant_db_path(name)):
+        raise LookupError(f'租户不存在：{name}')
+    return tenants.get(name)
+
+
+@contextmanager
+def tenant_context(tenant):
+    # 后台线程 / 命令行中切换到指定租户
+    with app.app_context():
+        g.tenant = tenant
+        yield tenant
+
+
+@app.before_request
+def select_tenant():
+    # 多租户模式下每个请求按 X-Tenant 请求头或 ?tenant= 参数（记入会话）选择租户
+    if not app.config['TENANT_DIR'] or request.endpoint == 'static':
+        return None
+    name = request.headers.get('X-Tenant') or request.args.get('tenant') or session.get('tenant')
+    if not name:
+        return jsonify(error='缺少租户标识（X-Tenant 请求头或 ?tenant= 参数）'), 400
+    try:
+        g.tenant = resolve_tenant(name)
+    except LookupError as e:
+        return jsonify(error=str(e)), 404
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    if 'tenant' in request.args:
+        session['tenant'] = name
+    return None
 
 
 # ==================================
 # 3. 路由
 # ==================================
+def iter_contact_rows(query, chunk_size):
+    # yield_per 分块读取联系人；联系方式取自汇总列，只读 contact 一张表
+    for c in query.yield_per(chunk_size):
+        yield c, c.method_list
+
+
 @app.route('/')
 def index():
-    contacts = Contact.query.order_by(
+    query = Contact.query.order_by(
         Contact.is_bookmarked.desc(),
         Contact.group.asc(),
         Contact.first_letter.asc(),
         Contact.name.asc()
-    ).all()
-
+    )
+    total = Contact.query.count()
+    stream = request.args.get('stream') == '1'
+    view = request.args.get('view')
+    if view is None and not stream and total > app.config['VIRTUAL_LIST_THRESHOLD']:
+        view = 'virtual'
+
+    # 虚拟滚动视图：页面只有框架，行数据由 /api/contacts 分块获取
+    if view == 'virtual':
+        full_html = BASE_HTML.replace('{% block content %}{% endblock %}', VIRTUAL_LIST_HTML_CONTENT)
+        return render_template_string(full_html, total=total, view=view)
+
+    rows = iter_contact_rows(query, app.config['LIST_CHUNK_SIZE'])
     full_html = BASE_HTML.replace('{% block content %}{% endblock %}', INDEX_HTML_CONTENT)
-    return render_template_string(full_html, contacts=contacts)
+
+    if not stream and total <= app.config['STREAM_RENDER_THRESHOLD']:
+        return render_template_string(full_html, rows=list(rows), total=total, view=view)
+
+    # 流式输出：边读边渲染，首字节时间和内存占用与联系人数量无关。
+    # 先取出 flash 消息，保证会话 cookie 随响应头一起写出
+    get_flashed_messages(with_categories=True)
+    context = {'rows': rows, 'total': total, 'view': view}
+    app.update_template_context(context)
+    stream = app.jinja_env.from_string(full_html).stream(context)
+    stream.enable_buffering(50)
+    return Response(stream_with_context(stream), mimetype='text/html')
 
 
 @app.route('/add', methods=['GET', 'POST'])
 def add_contact():
     if request.method == 'POST':
+        if avatar_request_too_large():
+            flash(f"头像不能超过 {app.config['AVATAR_MAX_BYTES'] // 1024 // 1024} MB", 'danger')
+            return redirect(url_for('add_contact'))
+
         name = request.form['name']
         group = request.form.get('group', '未分组')
         first_letter = get_first_letter(name)
@@ -109,10 +1090,11 @@ def add_contact():
         photo_file = request.files.get('photo')
         photo_path = None
         if photo_file and photo_file.filename:
-            avatar_dir = os.path.join(app.root_path, 'static', 'avatars')
-            os.makedirs(avatar_dir, exist_ok=True)
-            photo_path = os.path.join('static', 'avatars', photo_file.filename)
-            photo_file.save(os.path.join(app.root_path, photo_path))
+            try:
+                photo_path = save_avatar(photo_file)
+            except AvatarError as e:
+                flash(str(e), 'danger')
+                return redirect(url_for('add_contact'))
 
         new_contact = Contact(
             name=name,
@@ -127,9 +1109,9 @@ def add_contact():
         values = request.form.getlist('value[]')
         for mtype, val in zip(methods, values):
             if mtype and val:
-                db.session.add(ContactMethod(contact_id=new_contact.id, method_type=mtype, value=val))
+                db.session.add(build_method(new_contact.id, mtype, val))
 
-        db.session.commit()
+        commit_changes(updated=[new_contact])
         flash(f'联系人 "{name}" 已添加。', 'success')
         return redirect(url_for('index'))
 
@@ -142,18 +1124,22 @@ def edit_contact(contact_id):
     contact = db.get_or_404(Contact, contact_id)
 
     if request.method == 'POST':
-        contact.name = request.form['name']
-        contact.group = request.form.get('group', '未分组')
-        contact.first_letter = get_first_letter(contact.name)
+        if avatar_request_too_large():
+            flash(f"头像不能超过 {app.config['AVATAR_MAX_BYTES'] // 1024 // 1024} MB", 'danger')
+            return redirect(url_for('edit_contact', contact_id=contact.id))
 
-        # ---- 头像更新 ----
+        # ---- 头像更新（先校验头像，失败时不修改联系人） ----
         photo_file = request.files.get('photo')
         if photo_file and photo_file.filename:
-            avatar_dir = os.path.join(app.root_path, 'static', 'avatars')
-            os.makedirs(avatar_dir, exist_ok=True)
-            photo_path = os.path.join('static', 'avatars', photo_file.filename)
-            photo_file.save(os.path.join(app.root_path, photo_path))
-            contact.photo_path = photo_path
+            try:
+                contact.photo_path = save_avatar(photo_file)
+            except AvatarError as e:
+                flash(str(e), 'danger')
+                return redirect(url_for('edit_contact', contact_id=contact.id))
+
+        contact.name = request.form['name']
+        contact.group = request.form.get('group', '未分组')
+        contact.first_letter = get_first_letter(contact.name)
 
         # ---- 联系方式更新 ----
         ContactMethod.query.filter_by(contact_id=contact.id).delete()
@@ -161,9 +1147,9 @@ def edit_contact(contact_id):
         values = request.form.getlist('value[]')
         for mtype, val in zip(methods, values):
             if mtype and val:
-                db.session.add(ContactMethod(contact_id=contact.id, method_type=mtype, value=val))
+                db.session.add(build_method(contact.id, mtype, val))
 
-        db.session.commit()
+        commit_changes(updated=[contact])
         flash(f'联系人 "{contact.name}" 已更新。', 'success')
         return redirect(url_for('index'))
 
@@ -175,7 +1161,7 @@ def edit_contact(contact_id):
 def delete_contact(contact_id):
     contact = db.get_or_404(Contact, contact_id)
     db.session.delete(contact)
-    db.session.commit()
+    commit_changes(deleted_ids=[contact_id])
     flash(f'联系人 "{contact.name}" 已删除。', 'warning')
     return redirect(url_for('index'))
 
@@ -184,44 +1170,399 @@ def delete_contact(contact_id):
 def toggle_bookmark(contact_id):
     contact = db.get_or_404(Contact, contact_id)
     contact.is_bookmarked = not contact.is_bookmarked
-    db.session.commit()
+    commit_changes()
     flash(f'联系人 "{contact.name}" 的收藏状态已更新。', 'info')
     return redirect(url_for('index'))
 
 
+# ---- 导出快照：按数据版本缓存在磁盘上（每个租户各自的目录） ----
+EXPORT_COLUMNS = OrderedDict([
+    ('name', '姓名'),
+    ('group', '分组'),
+    ('bookmarked', '收藏'),
+    ('letter', '首字母'),
+    ('methods', '联系方式 (Type: Value)'),
+])
+EXPORT_FORMATS = ('xlsx', 'csv', 'jsonl')
+
+
+def parse_export_options(args):
+    # 规范化导出参数，结果同时用作快照缓存键
+    columns = [c for c in args.get('columns', '').split(',') if c] or list(EXPORT_COLUMNS)
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f'未知的导出列：{", ".join(unknown)}')
+    fmt = args.get('format', 'xlsx')
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'不支持的导出格式：{fmt}')
+    bookmarked = args.get('bookmarked', '')
+    return {
+        'columns': columns,
+        'format': fmt,
+        'group': args.get('group', '').strip(),
+        'bookmarked': bookmarked if bookmarked in ('0', '1') else '',
+        'letter': args.get('letter', '').strip().upper()[:1],
+        'q': args.get('q', '').strip(),
+    }
+
+
+def build_export_query(options):
+    # 筛选和列投影都在 SQL 中完成，只读取需要的行和列
+    exprs = {
+        'name': Contact.name.label('name'),
+        'group': ContactGroup.name.label('group'),
+        'bookmarked': db.case((Contact.is_bookmarked, '是'), else_='否').label('bookmarked'),
+        'letter': Contact.first_letter.label('letter'),
+    }
+    if 'methods' in options['columns']:
+        # 从汇总列展开，不再关联 contact_method
+        items = db.func.json_each(Contact.method_summary).table_valued('value')
+        item = db.func.json_extract(items.c.value, '$[0]') + ': ' + db.func.json_extract(items.c.value, '$[1]')
+        exprs['methods'] = db.select(db.func.coalesce(db.func.group_concat(item, '; '), '')) \
+            .scalar_subquery().label('methods')
+
+    stmt = db.select(*[exprs[c] for c in options['columns']]).select_from(Contact)
+    if 'group' in options['columns']:
+        stmt = stmt.outerjoin(ContactGroup, ContactGroup.id == Contact.group_id)
+
+    if options['group']:
+        group_id = group_names.find_id(options['group'])
+        stmt = stmt.where(Contact.group_id == group_id if group_id is not None else db.false())
+    if options['bookmarked']:
+        stmt = stmt.where(Contact.is_bookmarked == (options['bookmarked'] == '1'))
+    if options['letter']:
+        stmt = stmt.where(Contact.first_letter == options['letter'])
+    if options['q']:
+        items = db.func.json_each(Contact.method_summary).table_valued('value')
+        stmt = stmt.where(db.or_(
+            Contact.name.contains(options['q'], autoescape=True),
+            db.select(1).select_from(items).where(
+                db.func.json_extract(items.c.value, '$[1]').contains(options['q'], autoescape=True)).exists(),
+        ))
+    return stmt.order_by(Contact.id)
+
+
+def write_export_file(path, options):
+    headers = [EXPORT_COLUMNS[c] for c in options['columns']]
+    rows = db.session.execute(build_export_query(options).execution_options(yield_per=1000))
+    fmt = options['format']
+    if fmt == 'xlsx':
+        pd.DataFrame(rows.all(), columns=headers).to_excel(path, index=False)
+    elif fmt == 'csv':
+        # utf-8-sig 让 Excel 正确识别中文
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(headers, row)), ensure_ascii=False) + '\n')
+
+
+def export_snapshot_path(version, options):
+    # 文件名即 ETag，包含数据库 id，切换租户后不会与另一个库同版本的快照混淆
+    ident = f'{get_database_id()}:{json.dumps(options, sort_keys=True)}'
+    key = hashlib.sha1(ident.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(current_tenant().export_dir, f'contacts-v{version}-{key}.{options["format"]}')
+
+
+def ensure_export_snapshot(version, options):
+    tenant = current_tenant()
+    path = export_snapshot_path(version, options)
+    with tenant.export_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(tenant.export_dir, exist_ok=True)
+        tmp_path = os.path.join(tenant.export_dir, '.tmp-' + os.path.basename(path))
+        write_export_file(tmp_path, options)
+        os.replace(tmp_path, path)
+
+        # 只保留当前版本的快照
+        for old in glob.glob(os.path.join(tenant.export_dir, 'contacts-v*')):
+            if not os.path.basename(old).startswith(f'contacts-v{version}-'):
+                os.remove(old)
+    return path
+
+
+def open_export_snapshot(version, options):
+    # 在锁内打开文件：并发的版本轮换随后删除它也不影响已打开的句柄，send_file 不会找不到文件
+    with current_tenant().export_lock:
+        return open(ensure_export_snapshot(version, options), 'rb')
+
+
+def rebuild_export_snapshot(tenant=None):
+    # 后台只预生成最常用的全量 Excel 导出，带筛选的导出在首次请求时生成
+    with tenant_context(tenant or default_tenant):
+        ensure_export_snapshot(get_data_version(), parse_export_options({}))
+
+
+def schedule_export_rebuild():
+    # 防抖：连续写入时不断推迟，写入平静下来后才在后台重建一次
+    tenant = current_tenant()
+    if tenant.export_timer is not None:
+        tenant.export_timer.cancel()
+    tenant.export_timer = threading.Timer(app.config['EXPORT_REBUILD_DELAY'], rebuild_export_snapshot,
+                                          args=(tenant,))
+    tenant.export_timer.daemon = True
+    tenant.export_timer.start()
+
+
+@app.route('/bulk', methods=['POST'])
+def bulk_action():
+    action = request.form.get('action')
+    ids = request.form.getlist('ids', type=int)
+    if not ids:
+        flash('请先勾选联系人', 'warning')
+        return redirect(url_for('index'))
+
+    # 每个批量操作都是一条 UPDATE / DELETE ... WHERE id IN (...)，在同一事务中提交
+    if action == 'move':
+        group = request.form.get('group', '未分组')
+        result = db.session.execute(db.update(Contact).where(Contact.id.in_(ids))
+                                    .values(group_id=group_names.id_for(group)))
+        commit_changes()
+        flash(f'已将 {result.rowcount} 个联系人移动到 "{group}"。', 'success')
+    elif action in ('bookmark', 'unbookmark'):
+        result = db.session.execute(db.update(Contact).where(Contact.id.in_(ids))
+                                    .values(is_bookmarked=(action == 'bookmark')))
+        commit_changes()
+        flash(f'已更新 {result.rowcount} 个联系人的收藏状态。', 'info')
+    elif action == 'delete':
+        db.session.execute(db.delete(ContactMethod).where(ContactMethod.contact_id.in_(ids)))
+        result = db.session.execute(db.delete(Contact).where(Contact.id.in_(ids)))
+        commit_changes(deleted_ids=ids)
+        flash(f'已删除 {result.rowcount} 个联系人。', 'warning')
+    else:
+        flash('未知的批量操作', 'danger')
+    return redirect(url_for('index'))
+
+
 @app.route('/export')
 def export_contacts():
-    contacts_data = db.session.query(Contact, ContactMethod).outerjoin(ContactMethod).all()
-
-    export_rows = []
-    contact_dict = {}
-
-    for contact, method in contacts_data:
-        if contact.id not in contact_dict:
-            contact_dict[contact.id] = {
-                '姓名': contact.name,
-                '分组': contact.group,
-                '收藏': '是' if contact.is_bookmarked else '否',
-                '首字母': contact.first_letter,
-                '联系方式': []
-            }
-        if method:
-            contact_dict[contact.id]['联系方式'].append(f"{method.method_type}: {method.value}")
-
-    for cid, info in contact_dict.items():
-        export_rows.append({
-            '姓名': info['姓名'],
-            '分组': info['分组'],
-            '收藏': info['收藏'],
-            '首字母': info['首字母'],
-            '联系方式 (Type: Value)': '; '.join(info['联系方式'])
-        })
+    try:
+        options = parse_export_options(request.args)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('index'))
 
-    df = pd.DataFrame(export_rows)
-    buf = io.BytesIO()
-    df.to_excel(buf, index=False)
-    buf.seek(0)
-    return send_file(buf, as_attachment=True, download_name="联系人导出.xlsx")
+    version = get_data_version()
+    f = open_export_snapshot(version, options)
+    stat = os.fstat(f.fileno())
+    # 带 ETag / Last-Modified，重复下载直接返回文件或 304；
+    # 传入的是文件对象，长度和 Range 支持需按已打开文件的大小自行补上
+    response = send_file(f, as_attachment=True, download_name=f"联系人导出.{options['format']}",
+                         etag=os.path.splitext(os.path.basename(f.name))[0],
+                         last_modified=stat.st_mtime, conditional=False, max_age=0)
+    response.content_length = stat.st_size
+    if app.config['TENANT_DIR']:
+        # 同一 URL 按请求头或会话中的租户返回不同内容，共享缓存须按二者区分
+        response.vary.update(('X-Tenant', 'Cookie'))
+    return response.make_conditional(request, accept_ranges=True, complete_length=stat.st_size)
+
+
+# ---- 导入：解析（可在子进程中并行）与批量写入分离 ----
+def cell_text(row, column, default=''):
+    value = row.get(column, default)
+    return default if pd.isna(value) else str(value).strip()
+
+
+def parse_import_frame(df):
+    # 把表格行规范化为导入记录，首字母和反查键也在这里算好
+    records, skipped = [], 0
+    for _, row in df.iterrows():
+        name = cell_text(row, '姓名')
+        if not name:
+            skipped += 1
+            continue
+        methods = []
+        for part in cell_text(row, '联系方式 (Type: Value)').split(';'):
+            if ':' in part:
+                t, v = (x.strip() for x in part.split(':', 1))
+                methods.append((t, v, normalize_lookup_key(t, v)))
+        records.append({
+            'name': name,
+            'group': cell_text(row, '分组', '未分组') or '未分组',
+            'is_bookmarked': cell_text(row, '收藏', '否') == '是',
+            'first_letter': get_first_letter(name),
+            'methods': methods,
+        })
+    return records, skipped
+
+
+def parse_import_sheet(path, sheet_name):
+    # 进程池任务：只做 CPU 密集的解析，不接触数据库
+    records, skipped = parse_import_frame(pd.read_excel(path, sheet_name=sheet_name))
+    return {'records': records, 'skipped': skipped}
+
+
+def apply_import_records(records):
+    # 同名联系人以最后一行为准；已有联系人一次查出，联系方式按集合删除后批量插入
+    latest = {}
+    for r in records:
+        latest[r['name']] = r
+    names = list(latest)
+    existing = {}
+    for i in range(0, len(names), 500):
+        for c in Contact.query.filter(Contact.name.in_(names[i:i + 500])).order_by(Contact.id):
+            existing.setdefault(c.name, c)
+
+    contacts = []
+    for name, r in latest.items():
+        contact = existing.get(name)
+        if contact is None:
+            contact = Contact(name=name)
+            db.session.add(contact)
+        contact.group = r['group']
+        contact.is_bookmarked = r['is_bookmarked']
+        contact.first_letter = r['first_letter']
+        contacts.append(contact)
+    db.session.flush()
+
+    existing_ids = [c.id for c in existing.values()]
+    if existing_ids:
+        db.session.execute(db.delete(ContactMethod).where(ContactMethod.contact_id.in_(existing_ids)))
+    db.session.add_all(
+        ContactMethod(contact_id=c.id, type_id=method_type_names.id_for(t), value=v, lookup_key=k)
+        for c in contacts for t, v, k in latest[c.name]['methods']
+    )
+    return contacts
+
+
+# ---- 导入预览（dry-run）：向量化解析并与现有联系人比对，不写数据库 ----
+IMPORT_METHODS_COLUMN = '联系方式 (Type: Value)'
+
+
+def import_column(df, column, default=''):
+    if column not in df:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].astype(object).where(df[column].notna(), default).astype(str).str.strip()
+
+
+def load_existing_for_diff(names):
+    # 复用导出查询：分组名、收藏与 "类型: 值; ..." 形式的联系方式在 SQL 中拼好，一条查询按姓名列表取回
+    options = dict(parse_export_options({}), columns=['name', 'group', 'bookmarked', 'methods'])
+    rows = db.session.execute(build_export_query(options).where(Contact.name.in_(json_each_values(names)))).all()
+    existing = pd.DataFrame(rows, columns=['name', 'group', 'bookmarked', 'methods'])
+    # 与 apply_import_records 一致：同名的已有联系人取 id 最小的一个
+    existing = existing.drop_duplicates('name', keep='first').set_index('name')
+    existing['group'] = existing['group'].fillna(DEFAULT_GROUPS[0])
+    return existing
+
+
+def preview_import_frame(df):
+    # 对每行给出 create / update / unchanged / skip / duplicate，以及无法解析的联系方式片段
+    df = df.reset_index(drop=True)
+    names = import_column(df, '姓名')
+    groups = import_column(df, '分组', '未分组').replace('', '未分组')
+    bookmarked = import_column(df, '收藏', '否').eq('是').map({True: '是', False: '否'})
+
+    # 联系方式：按 ';' 拆成片段、再按第一个 ':' 拆成类型和值，全部是整列的字符串运算
+    parts = import_column(df, IMPORT_METHODS_COLUMN).str.split(';').explode().str.strip()
+    parts = parts[parts.ne('') & parts.notna()]
+    # 没有任何片段时 partition 返回空表，补齐三列
+    pairs = parts.str.partition(':').reindex(columns=[0, 1, 2], fill_value='').astype(str)
+    types, values = pairs[0].str.strip(), pairs[2].str.strip()
+    parsed = pairs[1].eq(':')
+    bad = ~parsed | types.eq('') | values.eq('')
+    # 按行拼回与导出相同的 "类型: 值; 类型: 值"（分组求和即字符串拼接，比逐组 join 快得多）
+    methods = (types[parsed] + ': ' + values[parsed] + '; ').groupby(level=0).sum().str[:-2] \
+        .reindex(df.index, fill_value='')
+    malformed = parts[bad].groupby(level=0).agg(list).to_dict()
+
+    action = pd.Series('skip', index=df.index, dtype=object)
+    named = names.ne('')
+    action[named & names.duplicated(keep='last')] = 'duplicate'
+    effective = named & action.ne('duplicate')
+
+    new = pd.DataFrame({'group': groups, 'bookmarked': bookmarked, 'methods': methods})
+    old = load_existing_for_diff(names[effective].unique().tolist()).reindex(names.tolist())
+    old.index = df.index
+    found = effective & old['methods'].notna()
+    differs = {f: found & old[f].ne(new[f]) for f in new.columns}
+    changed = differs['group'] | differs['bookmarked'] | differs['methods']
+    action[effective] = 'create'
+    action[found & changed] = 'update'
+    action[found & ~changed] = 'unchanged'
+
+    # 逐行组装报告时只访问普通列表，避免按标签取值的开销
+    columns = list(new.columns)
+    new_values = dict(zip(columns, (new[f].tolist() for f in columns)))
+    old_values = dict(zip(columns, (old[f].tolist() for f in columns)))
+    differ_flags = dict(zip(columns, (differs[f].tolist() for f in columns)))
+    rows = []
+    for i, (name, act) in enumerate(zip(names.tolist(), action.tolist())):
+        entry = {'row': i + 2, 'name': name, 'action': act}  # 第 1 行是表头
+        if act == 'create':
+            entry['changes'] = {f: [None, new_values[f][i]] for f in columns}
+        elif act == 'update':
+            entry['changes'] = {f: [old_values[f][i], new_values[f][i]] for f in columns if differ_flags[f][i]}
+        if i in malformed:
+            entry['malformed'] = malformed[i]
+        rows.append(entry)
+
+    counts = action.value_counts()
+    known_groups = set(db.session.execute(db.select(ContactGroup.name)).scalars())
+    known_types = set(db.session.execute(db.select(MethodType.name)).scalars())
+    summary = {
+        'rows': len(df),
+        **{a: int(counts.get(a, 0)) for a in ('create', 'update', 'unchanged', 'skip', 'duplicate')},
+        'malformed': len(malformed),
+        'new_groups': sorted(set(groups[effective]) - known_groups),
+        'new_method_types': sorted(set(types[parsed & effective.reindex(types.index)]) - known_types),
+    }
+    return {'summary': summary, 'rows': rows}
+
+
+def partial_import_note(entry):
+    if 'failed_records' not in entry:
+        return ''
+    first, last = entry['failed_records']
+    return f"（已导入 {entry['imported']} 个，第 {first}–{last} 条记录未导入）"
+
+
+def run_batch_import(paths, progress=None):
+    # 各文件的各工作表在进程池中并行解析，结果回到当前线程按批次事务写入。
+    # 写入按提交顺序进行（先完成的解析结果在 Future 中等待），跨工作表的同名联系人总以靠后的为准
+    report = {'sheets': [], 'imported': 0, 'skipped': 0, 'errors': 0}
+    tasks = []
+    for path in paths:
+        try:
+            with pd.ExcelFile(path) as book:
+                tasks.extend((path, sheet) for sheet in book.sheet_names)
+        except Exception as e:
+            report['sheets'].append({'file': os.path.basename(path), 'sheet': None, 'error': str(e)})
+            report['errors'] += 1
+
+    batch_size = app.config['IMPORT_BATCH_SIZE']
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=app.config['IMPORT_WORKERS'], mp_context=ctx) as pool:
+        futures = [(pool.submit(parse_import_sheet, path, sheet), path, sheet) for path, sheet in tasks]
+        for done, (future, path, sheet) in enumerate(futures, start=1):
+            entry = {'file': os.path.basename(path), 'sheet': sheet}
+            imported, i = 0, 0
+            try:
+                parsed = future.result()
+                records = parsed['records']
+                for i in range(0, len(records), batch_size):
+                    contacts = apply_import_records(records[i:i + batch_size])
+                    commit_changes(updated=contacts)
+                    imported += len(contacts)
+                entry.update(imported=imported, skipped=parsed['skipped'])
+                report['skipped'] += parsed['skipped']
+            except Exception as e:
+                db.session.rollback()
+                entry['error'] = str(e)
+                report['errors'] += 1
+                if imported:
+                    # 此前的批次已提交：记下已导入数和未导入的记录范围（从 1 起，含两端），便于补导
+                    entry['imported'] = imported
+                    entry['failed_records'] = [i + 1, len(records)]
+            report['imported'] += imported
+            report['sheets'].append(entry)
+            if progress:
+                progress(done, len(tasks), entry)
+    return report
 
 
 @app.route('/import', methods=['POST'])
@@ -230,45 +1571,385 @@ def import_contacts():
         flash("未选择文件", "danger")
         return redirect(url_for('index'))
 
-    file = request.files['file']
-    df = pd.read_excel(file)
-
-    imported = 0
+    df = pd.read_excel(request.files['file'])
+    if request.form.get('dry_run') == '1':
+        report = preview_import_frame(df)
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(report)
+        summary = report['summary']
+        flash(f"导入预览（未写入）：新增 {summary['create']}，更新 {summary['update']}，"
+              f"无变化 {summary['unchanged']}，跳过 {summary['skip']}，"
+              f"被同名后续行覆盖 {summary['duplicate']}，联系方式格式有误 {summary['malformed']} 行", "info")
+        for entry in [r for r in report['rows'] if 'malformed' in r][:10]:
+            flash(f"第 {entry['row']} 行 {entry['name'] or '(无姓名)'}：无法解析 "
+                  f"{'; '.join(entry['malformed'])}", "warning")
+        return redirect(url_for('index'))
 
-    for _, row in df.iterrows():
-        name = str(row.get('姓名', '')).strip()
-        if not name:
-            continue
+    records, _ = parse_import_frame(df)
+    imported = apply_import_records(records)
 
-        group = str(row.get('分组', '未分组'))
-        is_bookmarked = str(row.get('收藏', '否')) == '是'
-        contact_string = str(row.get('联系方式 (Type: Value)', '')).strip()
+    commit_changes(updated=imported)
+    flash(f"成功导入 {len(imported)} 个联系人", "success")
+    return redirect(url_for('index'))
 
-        contact = Contact.query.filter_by(name=name).first()
-        if not contact:
-            contact = Contact(name=name)
-            db.session.add(contact)
-            db.session.flush()
 
-        contact.group = group
-        contact.is_bookmarked = is_bookmarked
-        contact.first_letter = get_first_letter(name)
+@app.route('/import/batch', methods=['POST'])
+def import_contacts_batch():
+    files = [f for f in request.files.getlist('file') if f.filename]
+    if not files:
+        flash("未选择文件", "danger")
+        return redirect(url_for('index'))
 
-        ContactMethod.query.filter_by(contact_id=contact.id).delete()
-        for part in contact_string.split(';'):
-            if ':' in part:
-                t, v = part.split(':', 1)
-                db.session.add(ContactMethod(
-                    contact_id=contact.id,
-                    method_type=t.strip(),
-                    value=v.strip()
-                ))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i, f in enumerate(files):
+            path = os.path.join(tmpdir, f'{i}-{os.path.basename(f.filename)}')
+            f.save(path)
+            paths.append(path)
+        report = run_batch_import(paths)
+
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(report)
+    flash(f"批量导入完成：{len(files)} 个文件、{len(report['sheets'])} 个工作表，"
+          f"导入 {report['imported']} 个联系人，跳过 {report['skipped']} 行，"
+          f"失败 {report['errors']} 个", "danger" if report['errors'] else "success")
+    for entry in report['sheets']:
+        if 'error' in entry:
+            flash(f"{entry['file']} / {entry['sheet'] or '-'}：{entry['error']}{partial_import_note(entry)}",
+                  "danger")
+    return redirect(url_for('index'))
 
-        imported += 1
 
-    db.session.commit()
-    flash(f"成功导入 {imported} 个联系人", "success")
-    return redirect(url_for('index'))
+@app.cli.command('import-batch')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', type=int, default=None, help='解析进程数，默认为 CPU 核数')
+@click.option('--tenant', default=None, help='导入到指定租户（多租户模式）')
+def import_batch_command(paths, workers, tenant):
+    """并行导入多个 Excel 文件的全部工作表。"""
+    if workers:
+        app.config['IMPORT_WORKERS'] = workers
+    try:
+        g.tenant = resolve_tenant(tenant)
+    except (LookupError, ValueError) as e:
+        raise click.ClickException(str(e))
+    ensure_schema(g.tenant.get_engine())
+
+    def progress(done, total, entry):
+        if 'error' in entry:
+            detail = f"失败：{entry['error']}{partial_import_note(entry)}"
+        else:
+            detail = f"导入 {entry['imported']}，跳过 {entry['skipped']}"
+        click.echo(f"[{done}/{total}] {entry['file']} / {entry['sheet']}：{detail}")
+
+    report = run_batch_import(paths, progress)
+    for entry in report['sheets']:
+        if entry['sheet'] is None:
+            click.echo(f"{entry['file']}：无法读取：{entry['error']}")
+    click.echo(f"合计：导入 {report['imported']} 个联系人，跳过 {report['skipped']} 行，"
+               f"失败 {report['errors']} 个")
+
+
+# ---- 来电显示 / 邮箱反查 API ----
+def contact_brief(contact):
+    return {
+        'id': contact.id,
+        'name': contact.name,
+        'group': contact.group,
+        'is_bookmarked': contact.is_bookmarked,
+        'photo_path': contact.photo_path,
+        'primary_phone': contact.primary_phone,
+    }
+
+
+@app.route('/api/lookup')
+def api_lookup():
+    phone = request.args.get('phone', '').strip()
+    email = request.args.get('email', '').strip()
+    if phone:
+        key = normalize_lookup_key('电话', phone)
+    elif email:
+        key = normalize_lookup_key('邮箱', email)
+    else:
+        key = None
+    if not key:
+        return jsonify(error='请提供 phone 或 email 参数'), 400
+
+    def load():
+        contacts = Contact.query.join(ContactMethod).filter(
+            ContactMethod.lookup_key == key
+        ).distinct().order_by(Contact.id).all()
+        return [contact_brief(c) for c in contacts]
+
+    # 未命中的号码同样缓存，陌生来电也不会反复查库
+    matches = current_tenant().lookup_cache.get_or_load(key, load)
+    return jsonify(key=key, matches=matches), (200 if matches else 404)
+
+
+# ---- 输入联想 API（姓名 / 全拼 / 拼音首字母前缀） ----
+@app.route('/api/suggest')
+def api_suggest():
+    q = request.args.get('q', '')
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    return jsonify(q=q, suggestions=ensure_suggest_index().search(q, limit))
+
+
+# ---- 列表分块 API（键集分页，供虚拟滚动使用） ----
+def list_sort_key():
+    # 与首页排序一致：收藏优先、分组、首字母、姓名，最后用 id 保证唯一
+    return (
+        db.case((Contact.is_bookmarked, 0), else_=1),
+        db.func.coalesce(ContactGroup.name, ''),
+        db.func.coalesce(Contact.first_letter, ''),
+        Contact.name,
+        Contact.id,
+    )
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, size):
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    # 游标必须是与排序键等长的标量列表，否则拼不出元组比较
+    if not isinstance(values, list) or len(values) != size or \
+            not all(isinstance(v, (int, float, str)) and not isinstance(v, bool) for v in values):
+        raise ValueError('无效的游标')
+    return values
+
+
+@app.route('/api/contacts')
+def api_contacts():
+    limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+    key = list_sort_key()
+    stmt = db.select(Contact, *key).outerjoin(ContactGroup, ContactGroup.id == Contact.group_id)
+    if request.args.get('after'):
+        try:
+            after = decode_cursor(request.args['after'], len(key))
+        except ValueError:
+            return jsonify(error='无效的游标'), 400
+        stmt = stmt.where(db.tuple_(*key) > db.tuple_(*after))
+    page = db.session.execute(stmt.order_by(*key).limit(limit + 1)).all()
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    rows = [dict(contact_brief(r[0]), first_letter=r[0].first_letter, methods=r[0].method_list)
+            for r in page]
+    next_cursor = encode_cursor(list(page[-1][1:])) if has_more else None
+    return jsonify(rows=rows, next=next_cursor)
+
+
+# ---- 联系人变更历史 ----
+@app.route('/api/contacts/<int:contact_id>/history')
+def api_contact_history(contact_id):
+    audit_writer.flush()
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    logs = AuditLog.query.filter_by(contact_id=contact_id).order_by(
+        AuditLog.id.desc()).limit(limit).all()
+    return jsonify(contact_id=contact_id, history=[{
+        'entity': log.entity,
+        'entity_id': log.entity_id,
+        'action': log.action,
+        'changes': json.loads(log.changes),
+        'actor': log.actor,
+        'created_at': log.created_at.isoformat(timespec='seconds'),
+    } for log in logs])
+
+
+# ---- 联系方式汇总列：一致性检查与重建 ----
+@app.cli.command('check-summaries')
+@click.option('--fix', is_flag=True, help='重算不一致的联系人')
+@click.option('--tenant', default=None, help='检查指定租户（多租户模式）')
+def check_summaries_command(fix, tenant):
+    """比对汇总列与 contact_method 现算的结果。"""
+    try:
+        g.tenant = resolve_tenant(tenant)
+    except (LookupError, ValueError) as e:
+        raise click.ClickException(str(e))
+    stale = find_stale_summaries()
+    if not stale:
+        click.echo('汇总列全部一致')
+        return
+    click.echo(f"{len(stale)} 个联系人的汇总列不一致：{', '.join(map(str, stale[:20]))}"
+               f"{' ...' if len(stale) > 20 else ''}")
+    if not fix:
+        raise click.ClickException('可加 --fix 修复，或运行 rebuild-summaries 全部重建')
+    refresh_method_summaries(stale)
+    commit_changes()
+    click.echo(f'已修复 {len(stale)} 个联系人')
+
+
+@app.cli.command('rebuild-summaries')
+@click.option('--tenant', default=None, help='重建指定租户（多租户模式）')
+def rebuild_summaries_command(tenant):
+    """从 contact_method 重建全部联系人的汇总列。"""
+    try:
+        g.tenant = resolve_tenant(tenant)
+    except (LookupError, ValueError) as e:
+        raise click.ClickException(str(e))
+    count = refresh_method_summaries()
+    commit_changes()
+    click.echo(f'已重建 {count} 个联系人的汇总列')
+
+
+# ---- 数据库在线备份 ----
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def table_counts(conn):
+    tables = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+
+
+def avatar_manifest(avatar_dir):
+    entries = []
+    for root, _, files in os.walk(avatar_dir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            entries.append({
+                'path': os.path.relpath(path, avatar_dir),
+                'size': os.path.getsize(path),
+                'sha256': file_sha256(path),
+            })
+    return entries
+
+
+def verify_backup(snapshot_path, expected_counts):
+    # 还原校验：把快照还原到临时文件，做完整性检查并核对各表行数
+    with tempfile.TemporaryDirectory() as tmpdir:
+        restored = os.path.join(tmpdir, 'restored.db')
+        opener = gzip.open if snapshot_path.endswith('.gz') else open
+        with opener(snapshot_path, 'rb') as src, open(restored, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        conn = sqlite3.connect(restored)
+        try:
+            ok = conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+            return ok and table_counts(conn) == expected_counts
+        finally:
+            conn.close()
+
+
+def rotate_backups(backup_dir, keep):
+    manifests = sorted(glob.glob(os.path.join(backup_dir, 'address_book-*.json')))
+    for manifest in manifests[:-keep] if keep > 0 else []:
+        stem = manifest[:-len('.json')]
+        for path in (manifest, f'{stem}.db', f'{stem}.db.gz'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class BackupRestarted(Exception):
+    pass
+
+
+def create_backup(db_path, avatar_dir, backup_dir, compress=False, verify=True, keep=7,
+                  pages=256, step_sleep=0.005, max_restarts=3):
+    os.makedirs(backup_dir, exist_ok=True)
+    stem = os.path.join(backup_dir, 'address_book-' + datetime.now().strftime('%Y%m%d-%H%M%S-%f'))
+    snapshot = f'{stem}.db'
+
+    # SQLite 在线备份 API：分页复制，每步之间短暂休眠，期间读写请求照常进行。
+    # 其他连接每次提交都会让分页复制从头开始（remaining 回升），持续写入时可能永远完不成；
+    # 重启超过 max_restarts 次后改为一步复制全部页面，WAL 模式下只占用一个读快照，不阻塞写入
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(snapshot)
+    last = {'remaining': None, 'restarts': 0}
+
+    def progress(status, remaining, total):
+        if last['remaining'] is not None and remaining > last['remaining']:
+            last['restarts'] += 1
+            if last['restarts'] >= max_restarts:
+                raise BackupRestarted()
+        last['remaining'] = remaining
+        time.sleep(step_sleep)
+
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        except BackupRestarted:
+            src.backup(dst, pages=-1)
+        counts = table_counts(dst)
+    finally:
+        dst.close()
+        src.close()
+
+    if compress:
+        with open(snapshot, 'rb') as f_in, gzip.open(f'{snapshot}.gz', 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        os.remove(snapshot)
+        snapshot = f'{snapshot}.gz'
+
+    manifest = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'snapshot': os.path.basename(snapshot),
+        'size': os.path.getsize(snapshot),
+        'sha256': file_sha256(snapshot),
+        'compressed': compress,
+        'tables': counts,
+        'avatars': avatar_manifest(avatar_dir),
+    }
+    if verify:
+        manifest['verified'] = verify_backup(snapshot, counts)
+    with open(f'{stem}.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    rotate_backups(backup_dir, keep)
+    return manifest
+
+
+def backup_current_db(compress=False, verify=True):
+    tenant = current_tenant()
+    return create_backup(
+        tenant.db_path,
+        tenant.avatar_dir,
+        tenant.backup_dir,
+        compress=compress,
+        verify=verify,
+        keep=app.config['BACKUP_KEEP'],
+        pages=app.config['BACKUP_PAGES_PER_STEP'],
+        step_sleep=app.config['BACKUP_STEP_SLEEP'],
+    )
+
+
+@app.route('/admin/backup', methods=['POST'])
+def admin_backup():
+    # 设置了 ADDRESS_BOOK_ADMIN_TOKEN 时校验令牌，否则只允许本机调用
+    token = app.config['ADMIN_TOKEN']
+    if token:
+        if request.headers.get('X-Admin-Token') != token:
+            return jsonify(error='无权限'), 403
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify(error='无权限'), 403
+
+    manifest = backup_current_db(compress=request.args.get('compress') == '1',
+                                 verify=request.args.get('verify', '1') != '0')
+    return jsonify(manifest), (200 if manifest.get('verified', True) else 500)
+
+
+@app.cli.command('backup')
+@click.option('--compress', is_flag=True, help='gzip 压缩快照')
+@click.option('--no-verify', is_flag=True, help='跳过还原校验')
+@click.option('--keep', type=int, default=None, help='保留最近几份快照')
+@click.option('--tenant', default=None, help='备份指定租户（多租户模式）')
+def backup_command(compress, no_verify, keep, tenant):
+    """在线备份数据库（含头像清单），并轮换旧快照。"""
+    if keep is not None:
+        app.config['BACKUP_KEEP'] = keep
+    try:
+        g.tenant = resolve_tenant(tenant)
+    except (LookupError, ValueError) as e:
+        raise click.ClickException(str(e))
+    manifest = backup_current_db(compress=compress, verify=not no_verify)
+    click.echo(f"快照：{manifest['snapshot']}（{manifest['size']} 字节，"
+               f"{len(manifest['avatars'])} 个头像）")
+    if not manifest.get('verified', True):
+        raise click.ClickException('还原校验失败')
 
 
 # ==================================
@@ -460,6 +2141,11 @@ BASE_HTML = '''
             border: 2px dashed var(--border);
         }
 
+        .import-form .export-select {
+            width: auto;
+            padding: 8px 40px 8px 12px;
+        }
+
         .import-form input[type="file"] {
             padding: 8px;
             border: 1px solid var(--border);
@@ -562,6 +2248,86 @@ BASE_HTML = '''
         .group-classmate { background: #55efc4; color: #00b894; }
         .group-other { background: #dfe6e9; color: #636e72; }
 
+        .bulk-bar {
+            display: flex;
+            gap: 12px;
+            align-items: center;
+            flex-wrap: wrap;
+            margin-bottom: 10px;
+        }
+
+        .bulk-bar .bulk-group {
+            width: auto;
+            padding: 10px 45px 10px 15px;
+        }
+
+        .bulk-btn:disabled {
+            opacity: 0.5;
+            cursor: not-allowed;
+            transform: none;
+        }
+
+        .virtual-head, .virtual-row {
+            display: grid;
+            grid-template-columns: 30px 2fr 3fr 1.2fr 0.6fr 1.8fr;
+            gap: 10px;
+            align-items: center;
+            padding: 0 15px;
+        }
+
+        .virtual-head {
+            background: linear-gradient(to right, var(--primary), var(--primary-light));
+            color: white;
+            font-weight: 600;
+            padding: 20px 15px;
+            border-radius: 15px 15px 0 0;
+            margin-top: 20px;
+        }
+
+        .virtual-viewport {
+            height: 70vh;
+            overflow-y: auto;
+            background: white;
+            box-shadow: 0 5px 15px rgba(0, 0, 0, 0.05);
+        }
+
+        .virtual-spacer {
+            position: relative;
+        }
+
+        .virtual-row {
+            position: absolute;
+            left: 0;
+            right: 0;
+            height: 76px;
+            border-bottom: 1px solid var(--border);
+        }
+
+        .virtual-row:hover {
+            background-color: rgba(67, 97, 238, 0.05);
+        }
+
+        .virtual-name, .virtual-methods {
+            display: flex;
+            align-items: center;
+            overflow: hidden;
+            white-space: nowrap;
+            text-overflow: ellipsis;
+        }
+
+        .virtual-methods {
+            display: block;
+        }
+
+        .avatar-letter {
+            display: inline-flex;
+            align-items: center;
+            justify-content: center;
+            background: linear-gradient(135deg, var(--primary), var(--info));
+            color: white;
+            font-weight: bold;
+        }
+
         .bookmark-btn {
             background: none;
             border: none;
@@ -629,6 +2395,26 @@ BASE_HTML = '''
             padding-right: 45px;
         }
 
+        .suggest-list {
+            display: none;
+            margin-top: 6px;
+            background: white;
+            border: 2px solid var(--border);
+            border-radius: 12px;
+            overflow: hidden;
+        }
+
+        .suggest-list a {
+            display: block;
+            padding: 8px 18px;
+            color: var(--dark);
+            text-decoration: none;
+        }
+
+        .suggest-list a:hover {
+            background: rgba(67, 97, 238, 0.08);
+        }
+
         .photo-preview {
             width: 100px;
             height: 100px;
@@ -721,7 +2507,7 @@ BASE_HTML = '''
 </html>
 '''
 
-INDEX_HTML_CONTENT = '''
+LIST_HEADER_HTML = '''
 <div class="header">
     <h1><i class="fas fa-address-book"></i> 联系人地址簿</h1>
 </div>
@@ -730,21 +2516,77 @@ INDEX_HTML_CONTENT = '''
     <a href="{{url_for('add_contact')}}" class="btn btn-success">
         <i class="fas fa-user-plus"></i> 新增联系人
     </a>
-    <a href="{{url_for('export_contacts')}}" class="btn btn-primary">
-        <i class="fas fa-file-export"></i> 导出 Excel
+    {% if view == 'virtual' %}
+    <a href="{{url_for('index', view='table')}}" class="btn btn-light">
+        <i class="fas fa-table"></i> 完整表格
+    </a>
+    {% else %}
+    <a href="{{url_for('index', view='virtual')}}" class="btn btn-light">
+        <i class="fas fa-stream"></i> 滚动视图
     </a>
+    {% endif %}
+    <form method="GET" action="{{url_for('export_contacts')}}" class="import-form">
+        <select name="group" class="form-control export-select">
+            <option value="">全部分组</option>
+            <option value="家人">家人</option>
+            <option value="同事">同事</option>
+            <option value="朋友">朋友</option>
+            <option value="同学">同学</option>
+            <option value="未分组">未分组</option>
+        </select>
+        <label><input type="checkbox" name="bookmarked" value="1"> 仅收藏</label>
+        <select name="format" class="form-control export-select">
+            <option value="xlsx">Excel</option>
+            <option value="csv">CSV</option>
+            <option value="jsonl">JSON Lines</option>
+        </select>
+        <button class="btn btn-primary" type="submit">
+            <i class="fas fa-file-export"></i> 导出
+        </button>
+    </form>
 
     <form method="POST" action="{{url_for('import_contacts')}}" enctype="multipart/form-data" class="import-form">
         <input type="file" name="file" accept=".xlsx" required>
+        <label><input type="checkbox" name="dry_run" value="1"> 仅预览</label>
         <button class="btn btn-warning" type="submit">
             <i class="fas fa-file-import"></i> 导入 Excel
         </button>
     </form>
 </div>
+'''
+
+# 批量操作栏：表格视图与滚动视图共用
+BULK_BAR_HTML = '''
+<form id="bulk-form" method="POST" action="{{url_for('bulk_action')}}" class="bulk-bar">
+    <span><i class="fas fa-check-square"></i> 已选 <strong id="bulk-count">0</strong> 人</span>
+    <select name="group" class="form-control bulk-group">
+        <option value="家人">👨‍👩‍👧‍👦 家人</option>
+        <option value="同事">💼 同事</option>
+        <option value="朋友">👫 朋友</option>
+        <option value="同学">🎓 同学</option>
+        <option value="未分组">🏷️ 未分组</option>
+    </select>
+    <button type="submit" name="action" value="move" class="btn btn-primary bulk-btn" disabled>
+        <i class="fas fa-people-arrows"></i> 移动到分组
+    </button>
+    <button type="submit" name="action" value="bookmark" class="btn btn-light bulk-btn" disabled>
+        <i class="fas fa-star"></i> 收藏
+    </button>
+    <button type="submit" name="action" value="unbookmark" class="btn btn-light bulk-btn" disabled>
+        <i class="far fa-star"></i> 取消收藏
+    </button>
+    <button type="submit" name="action" value="delete" class="btn btn-danger bulk-btn" id="bulk-delete" disabled>
+        <i class="fas fa-trash-alt"></i> 删除所选
+    </button>
+</form>
+'''
+
+INDEX_HTML_CONTENT = LIST_HEADER_HTML + BULK_BAR_HTML + '''
 
 <table>
 <thead>
 <tr>
+    <th><input type="checkbox" id="select-all" title="全选"></th>
     <th><i class="fas fa-user"></i> 姓名</th>
     <th><i class="fas fa-phone-alt"></i> 联系方式</th>
     <th><i class="fas fa-users"></i> 分组</th>
@@ -753,8 +2595,9 @@ INDEX_HTML_CONTENT = '''
 </tr>
 </thead>
 <tbody>
-{% for c in contacts %}
+{% for c, methods in rows %}
 <tr>
+    <td><input type="checkbox" name="ids" value="{{c.id}}" form="bulk-form" class="row-check"></td>
     <td>
         <div style="display: flex; align-items: center;">
             {% if c.photo_path %}
@@ -774,10 +2617,10 @@ INDEX_HTML_CONTENT = '''
 
     <td>
         <div class="contact-methods">
-            {% for m in c.methods.all() %}
+            {% for method_type, value in methods %}
                 <div class="method-item">
-                    <span class="method-type">{{m.method_type}}</span>
-                    <span>{{m.value}}</span>
+                    <span class="method-type">{{method_type}}</span>
+                    <span>{{value}}</span>
                 </div>
             {% endfor %}
         </div>
@@ -828,17 +2671,37 @@ INDEX_HTML_CONTENT = '''
 </table>
 
 <div class="footer">
-    <p>共 {{ contacts|length }} 个联系人 | 系统版本 2.0 | 美化界面</p>
+    <p>共 {{ total }} 个联系人 | 系统版本 2.0 | 美化界面</p>
 </div>
 
 <script>
 // 添加动态效果
 document.addEventListener('DOMContentLoaded', function() {
-    // 为表格行添加动画延迟
+    // 为表格行添加动画延迟（只对首屏的行做动画，长列表无需等待）
     const rows = document.querySelectorAll('tbody tr');
     rows.forEach((row, index) => {
-        row.style.animationDelay = `${index * 0.05}s`;
-        row.style.animation = 'fadeIn 0.5s ease forwards';
+        if (index < 20) {
+            row.style.animationDelay = `${index * 0.05}s`;
+            row.style.animation = 'fadeIn 0.5s ease forwards';
+        }
+    });
+
+    // 多选批量操作
+    const rowChecks = document.querySelectorAll('.row-check');
+    const updateBulkBar = () => {
+        const n = document.querySelectorAll('.row-check:checked').length;
+        document.getElementById('bulk-count').textContent = n;
+        document.querySelectorAll('.bulk-btn').forEach(btn => btn.disabled = n === 0);
+    };
+    rowChecks.forEach(box => box.addEventListener('change', updateBulkBar));
+    document.getElementById('select-all').addEventListener('change', function() {
+        rowChecks.forEach(box => box.checked = this.checked);
+        updateBulkBar();
+    });
+    document.getElementById('bulk-delete').addEventListener('click', function(e) {
+        if (!confirm('⚠️ 确定要删除所选联系人吗？\\n\\n此操作无法恢复！')) {
+            e.preventDefault();
+        }
     });
 
     // 确认删除对话框美化
@@ -857,6 +2720,163 @@ document.addEventListener('DOMContentLoaded', function() {
 </script>
 '''
 
+VIRTUAL_LIST_HTML_CONTENT = LIST_HEADER_HTML + BULK_BAR_HTML + '''
+<div class="virtual-head">
+    <div><input type="checkbox" id="select-all" title="全选已加载"></div>
+    <div><i class="fas fa-user"></i> 姓名</div>
+    <div><i class="fas fa-phone-alt"></i> 联系方式</div>
+    <div><i class="fas fa-users"></i> 分组</div>
+    <div><i class="fas fa-star"></i> 收藏</div>
+    <div><i class="fas fa-cog"></i> 操作</div>
+</div>
+<div id="virtual-viewport" class="virtual-viewport">
+    <div id="virtual-spacer" class="virtual-spacer"></div>
+</div>
+
+<div class="footer">
+    <p>共 {{ total }} 个联系人 | 已加载 <span id="loaded-count">0</span> | 系统版本 2.0 | 美化界面</p>
+</div>
+
+<script>
+// 虚拟滚动：按键集游标分块获取 JSON，只渲染可视区域内的行
+document.addEventListener('DOMContentLoaded', function() {
+    const ROW_HEIGHT = 76, OVERSCAN = 8, CHUNK = 200;
+    const viewport = document.getElementById('virtual-viewport');
+    const spacer = document.getElementById('virtual-spacer');
+    const loaded = [];
+    // 勾选状态按 id 记在集合里，行元素被回收重建后仍能恢复
+    const selected = new Set();
+    const bulkForm = document.getElementById('bulk-form');
+    const selectAll = document.getElementById('select-all');
+    let cursor = null, finished = false, loading = false;
+
+    function updateBulkBar() {
+        document.getElementById('bulk-count').textContent = selected.size;
+        document.querySelectorAll('.bulk-btn').forEach(btn => btn.disabled = selected.size === 0);
+        selectAll.checked = loaded.length > 0 && selected.size === loaded.length;
+    }
+
+    const GROUP_BADGES = {
+        '家人': ['group-family', 'fa-home'],
+        '同事': ['group-colleague', 'fa-briefcase'],
+        '朋友': ['group-friend', 'fa-user-friends'],
+        '同学': ['group-classmate', 'fa-graduation-cap'],
+    };
+    const editUrl = id => "{{ url_for('edit_contact', contact_id=0) }}".replace(/0$/, id);
+    const bookmarkUrl = id => "{{ url_for('toggle_bookmark', contact_id=0) }}".replace(/0$/, id);
+    const deleteUrl = id => "{{ url_for('delete_contact', contact_id=0) }}".replace(/0$/, id);
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text == null ? '' : String(text);
+        return div.innerHTML;
+    }
+
+    function renderRow(c, index) {
+        const row = document.createElement('div');
+        row.className = 'virtual-row';
+        row.style.top = (index * ROW_HEIGHT) + 'px';
+        const avatar = c.photo_path
+            ? `<img src="/${escapeHtml(c.photo_path)}" class="avatar" alt="">`
+            : `<div class="avatar avatar-letter">${escapeHtml(c.first_letter)}</div>`;
+        const methods = c.methods.map(m =>
+            `<span class="method-type">${escapeHtml(m[0])}</span> <span>${escapeHtml(m[1])}</span>`).join(' ');
+        const badge = GROUP_BADGES[c.group] || ['group-other', 'fa-tag'];
+        row.innerHTML = `
+            <div><input type="checkbox" class="row-check"${selected.has(c.id) ? ' checked' : ''}></div>
+            <div class="virtual-name">${avatar}<span class="contact-name">${escapeHtml(c.name)}</span></div>
+            <div class="virtual-methods">${methods}</div>
+            <div><span class="group-badge ${badge[0]}"><i class="fas ${badge[1]}"></i> ${escapeHtml(c.group)}</span></div>
+            <div>
+                <form method="POST" action="${bookmarkUrl(c.id)}">
+                    <button type="submit" class="bookmark-btn"><i class="${c.is_bookmarked ? 'fas' : 'far'} fa-star"></i></button>
+                </form>
+            </div>
+            <div class="action-buttons">
+                <a href="${editUrl(c.id)}" class="btn btn-light"><i class="fas fa-edit"></i> 编辑</a>
+                <form method="POST" action="${deleteUrl(c.id)}" class="delete-form">
+                    <button type="submit" class="btn btn-danger"><i class="fas fa-trash-alt"></i> 删除</button>
+                </form>
+            </div>`;
+        row.querySelector('.row-check').addEventListener('change', function() {
+            if (this.checked) selected.add(c.id); else selected.delete(c.id);
+            updateBulkBar();
+        });
+        row.querySelector('.delete-form').addEventListener('submit', function(e) {
+            if (!confirm('⚠️ 确定要删除联系人 ' + c.name + ' 吗？\\n\\n此操作将永久删除该联系人的所有信息，无法恢复！')) {
+                e.preventDefault();
+            }
+        });
+        return row;
+    }
+
+    function render() {
+        const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        const last = Math.min(loaded.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+        spacer.style.height = (loaded.length * ROW_HEIGHT) + 'px';
+        const fragment = document.createDocumentFragment();
+        for (let i = first; i < last; i++) {
+            fragment.appendChild(renderRow(loaded[i], i));
+        }
+        spacer.replaceChildren(fragment);
+        if (!finished && last + OVERSCAN * 4 >= loaded.length) {
+            loadMore();
+        }
+    }
+
+    function loadMore() {
+        if (loading || finished) return;
+        loading = true;
+        const params = new URLSearchParams({limit: CHUNK});
+        if (cursor) params.set('after', cursor);
+        fetch("{{ url_for('api_contacts') }}?" + params)
+            .then(resp => resp.json())
+            .then(data => {
+                loaded.push(...data.rows);
+                cursor = data.next;
+                finished = !data.next;
+                document.getElementById('loaded-count').textContent = loaded.length;
+                updateBulkBar();
+                loading = false;
+                render();
+            })
+            .catch(() => { loading = false; });
+    }
+
+    selectAll.addEventListener('change', function() {
+        loaded.forEach(c => this.checked ? selected.add(c.id) : selected.delete(c.id));
+        render();
+        updateBulkBar();
+    });
+    // 提交时把集合中的 id 写成隐藏字段，不依赖当前渲染出的行
+    bulkForm.addEventListener('submit', function(e) {
+        if (e.submitter && e.submitter.value === 'delete' &&
+                !confirm('⚠️ 确定要删除所选联系人吗？\\n\\n此操作无法恢复！')) {
+            e.preventDefault();
+            return;
+        }
+        bulkForm.querySelectorAll('input[name="ids"]').forEach(input => input.remove());
+        selected.forEach(id => {
+            const input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = 'ids';
+            input.value = id;
+            bulkForm.appendChild(input);
+        });
+    });
+
+    let ticking = false;
+    viewport.addEventListener('scroll', function() {
+        if (!ticking) {
+            ticking = true;
+            requestAnimationFrame(() => { ticking = false; render(); });
+        }
+    });
+    loadMore();
+});
+</script>
+'''
+
 ADD_EDIT_HTML_CONTENT = '''
 <div class="header">
     <h1><i class="fas fa-user-edit"></i> {{ "编辑联系人" if contact else "添加新联系人" }}</h1>
@@ -869,9 +2889,10 @@ ADD_EDIT_HTML_CONTENT = '''
     <form method="POST" enctype="multipart/form-data">
         <div class="form-group">
             <label for="name"><i class="fas fa-signature"></i> 姓名 *</label>
-            <input type="text" id="name" name="name" class="form-control" required 
+            <input type="text" id="name" name="name" class="form-control" required autocomplete="off"
                    value="{{contact.name if contact else ""}}" 
-                   placeholder="请输入联系人姓名">
+                   placeholder="请输入联系人姓名（支持拼音首字母联想）">
+            <div id="name-suggest" class="suggest-list"></div>
         </div>
 
         <div class="form-group">
@@ -957,6 +2978,35 @@ ADD_EDIT_HTML_CONTENT = '''
 
 <script>
 document.addEventListener("DOMContentLoaded", function() {
+    // 姓名输入联想：提示已存在的同名 / 同拼音联系人
+    const nameInput = document.getElementById("name");
+    const suggestBox = document.getElementById("name-suggest");
+    const currentId = {{ contact.id if contact else "null" }};
+    let suggestTimer = null;
+    nameInput.addEventListener("input", function() {
+        clearTimeout(suggestTimer);
+        const q = this.value.trim();
+        if (!q) {
+            suggestBox.style.display = "none";
+            return;
+        }
+        suggestTimer = setTimeout(function() {
+            fetch("{{url_for('api_suggest')}}?q=" + encodeURIComponent(q))
+                .then(resp => resp.json())
+                .then(data => {
+                    const items = data.suggestions.filter(s => s.id !== currentId);
+                    suggestBox.innerHTML = "";
+                    items.forEach(s => {
+                        const link = document.createElement("a");
+                        link.href = "/edit/" + s.id;
+                        link.textContent = "已有联系人：" + s.name;
+                        suggestBox.appendChild(link);
+                    });
+                    suggestBox.style.display = items.length ? "block" : "none";
+                });
+        }, 120);
+    });
+
     // 添加联系方式行
     document.getElementById("add-method").addEventListener("click", function() {
         const methodsDiv = document.getElementById("contact-methods");
@@ -1024,8 +3074,8 @@ document.addEventListener("DOMContentLoaded", function() {
 # 5. 应用启动
 # ==================================
 if __name__ == '__main__':
+    init_db()
     with app.app_context():
-        db.create_all()
         print("系统已启动，增强功能已启用：分组 / 头像 / 首字母排序 ✔")
         print("美化界面已加载，访问 http://127.0.0.1:5000")
     app.run(debug=True)
\ No newline at end of file